@@ -0,0 +1,55 @@
+"""Time to push an array of inputs through a pipeline, item by item and vectorized.
+
+Run with:
+
+    python benchmarks/bench_columnar.py
+
+Requires numpy.
+"""
+
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+import numpy as np
+
+from resultpipes import Failure, Result, Success, pipeable
+from resultpipes.columnar import ResultBatch, VPipeable, vectorized
+
+N = 1_000_000
+
+
+@pipeable
+def checked(x: float) -> Result[float, str]:
+    return Success(x) if x >= 0 else Failure("negative")
+
+
+@pipeable
+def scaled(x: float) -> Result[float, str]:
+    return Success(x * 2.5 + 1)
+
+
+@vectorized
+def vchecked(x: np.ndarray) -> ResultBatch[float, str]:
+    return ResultBatch.masked(x, x >= 0, "negative")
+
+
+@vectorized
+def vscaled(x: np.ndarray) -> np.ndarray:
+    return x * 2.5 + 1
+
+
+def main() -> None:
+    inputs = np.random.default_rng(0).normal(size=N)
+    items = inputs.tolist()
+    pipe = checked | scaled
+    vpipe: VPipeable[Any, float, str] = vchecked | vscaled
+    per_item = min(timeit.repeat(lambda: [pipe(x) for x in items], number=1, repeat=3))
+    columnar = min(timeit.repeat(lambda: vpipe(inputs), number=1, repeat=3))
+    print(f"{'per item':<12} {per_item / N * 1e9:8.1f} ns/item")
+    print(f"{'vectorized':<12} {columnar / N * 1e9:8.1f} ns/item")
+
+
+if __name__ == "__main__":
+    main()
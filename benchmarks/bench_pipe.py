@@ -0,0 +1,124 @@
+"""Per-call overhead of composed pipelines, measured against hand-written equivalents.
+
+Run with:
+
+    python benchmarks/bench_pipe.py
+
+The failure-heavy cases model a cache lookup that misses and falls back through a chain of & handlers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import timeit
+from typing import Any, Awaitable, Callable
+
+from resultpipes import Failure, Result, Success, pipeable
+
+NUMBER = 100_000
+
+
+def lookup(x: int) -> Result[int, int]:
+    return Failure(x)
+
+
+async def alookup(x: int) -> Result[int, int]:
+    return Failure(x)
+
+
+def fallback(error: int) -> Result[int, int]:
+    return Failure(error)
+
+
+def recover(error: int) -> Result[int, int]:
+    return Success(error)
+
+
+async def arecover(error: int) -> Result[int, int]:
+    return Success(error)
+
+
+def check(x: int) -> Result[int, int]:
+    return Success(x)
+
+
+def by_hand(x: int) -> Result[int, int]:
+    result = lookup(x)
+    for handler in (fallback, fallback, fallback, recover):
+        if isinstance(result, Failure):
+            result = handler(result.value)
+    return result
+
+
+def checks_by_hand(x: int) -> Result[int, int]:
+    result = check(x)
+    for _ in range(39):
+        if isinstance(result, Success):
+            result = check(result.value)
+    return result
+
+
+async def aby_hand(x: int) -> Result[int, int]:
+    result = await alookup(x)
+    for handler in (fallback, fallback, fallback):
+        if isinstance(result, Failure):
+            result = handler(result.value)
+    if isinstance(result, Failure):
+        result = await arecover(result.value)
+    return result
+
+
+def report(name: str, seconds: float, baseline: float) -> None:
+    per_call = seconds / NUMBER * 1e9
+    overhead = (seconds - baseline) / NUMBER * 1e9
+    print(f"{name:<40} {per_call:8.0f} ns/call {overhead:+8.0f} ns overhead")
+
+
+def bench(f: Callable[[int], Any]) -> float:
+    return min(timeit.repeat(lambda: f(1), number=NUMBER, repeat=5))
+
+
+def abench(f: Callable[[int], Awaitable[Any]]) -> float:
+    async def run() -> None:
+        for _ in range(NUMBER):
+            await f(1)
+
+    def once() -> float:
+        return timeit.timeit(lambda: asyncio.run(run()), number=1)
+
+    return min(once() for _ in range(5))
+
+
+def main() -> None:
+    sync_failures = (
+        pipeable(lookup)
+        & pipeable(fallback)
+        & pipeable(fallback)
+        & pipeable(fallback)
+        & pipeable(recover)
+    )
+    baseline = bench(by_hand)
+    report("sync, failure-heavy: by hand", baseline, baseline)
+    report("sync, failure-heavy: pipeline", bench(sync_failures), baseline)
+
+    sync_successes = pipeable(check)
+    for _ in range(39):
+        sync_successes = sync_successes | pipeable(check)
+    baseline = bench(checks_by_hand)
+    report("sync, 40 stages: by hand", baseline, baseline)
+    report("sync, 40 stages: pipeline", bench(sync_successes), baseline)
+
+    async_failures = (
+        pipeable(alookup)
+        & pipeable(fallback)
+        & pipeable(fallback)
+        & pipeable(fallback)
+        & pipeable(arecover)
+    )
+    abaseline = abench(aby_hand)
+    report("async, failure-heavy: by hand", abaseline, abaseline)
+    report("async, failure-heavy: pipeline", abench(async_failures), abaseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Per-call cost of the tracing hooks, disabled, enabled, and with Metrics as an exporter and as a meter.
+
+Run with:
+
+    python benchmarks/bench_trace.py
+
+"without hooks" runs the same stages with a copy of Pipeable.__call__ that omits the check for
+exporters, so the difference from "hooks disabled" is the whole cost of tracing while it is off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import timeit
+from typing import Any, Awaitable, Callable
+
+from resultpipes import (
+    APipeable,
+    Metrics,
+    Pipeable,
+    Result,
+    Success,
+    metering,
+    pipeable,
+    tracing,
+)
+
+NUMBER = 100_000
+
+
+def check(x: int) -> Result[int, int]:
+    return Success(x)
+
+
+async def acheck(x: int) -> Result[int, int]:
+    return Success(x)
+
+
+class WithoutHooks(Pipeable[Any, Any, Any]):
+    def __call__(self, x: Any) -> Any:
+        result: Any = x
+        for accepts, func, _ in self._stages:
+            if accepts is None:
+                result = func(result)
+            elif isinstance(result, accepts):
+                result = func(result.value)
+        return result
+
+
+class AWithoutHooks(APipeable[Any, Any, Any]):
+    async def __call__(self, x: Any) -> Any:
+        result: Any = x
+        for accepts, func, is_async in self._plan:
+            if accepts is None:
+                result = func(result)
+            elif isinstance(result, accepts):
+                result = func(result.value)
+            else:
+                continue
+            if is_async:
+                result = await result
+        return result
+
+
+def discard(span: Any) -> None:
+    pass
+
+
+def report(name: str, seconds: float, baseline: float) -> None:
+    per_call = seconds / NUMBER * 1e9
+    overhead = (seconds - baseline) / NUMBER * 1e9
+    print(f"{name:<40} {per_call:8.0f} ns/call {overhead:+8.0f} ns overhead")
+
+
+def bench(f: Callable[[int], Any]) -> float:
+    return min(timeit.repeat(lambda: f(1), number=NUMBER, repeat=5))
+
+
+def abench(f: Callable[[int], Awaitable[Any]]) -> float:
+    async def run() -> None:
+        for _ in range(NUMBER):
+            await f(1)
+
+    def once() -> float:
+        return timeit.timeit(lambda: asyncio.run(run()), number=1)
+
+    return min(once() for _ in range(5))
+
+
+def main() -> None:
+    for length in (1, 5):
+        pipe = pipeable(check)
+        for _ in range(length - 1):
+            pipe = pipe | pipeable(check)
+        baseline = bench(WithoutHooks._from_stages(pipe._stages))
+        report(f"sync, {length} stages: without hooks", baseline, baseline)
+        report(f"sync, {length} stages: hooks disabled", bench(pipe), baseline)
+        with tracing(discard):
+            report(f"sync, {length} stages: tracing", bench(pipe), baseline)
+        with tracing(Metrics()):
+            report(f"sync, {length} stages: metrics exporter", bench(pipe), baseline)
+        with metering(Metrics().record):
+            report(f"sync, {length} stages: metrics meter", bench(pipe), baseline)
+
+    apipe = pipeable(check) | pipeable(acheck) | pipeable(check)
+    abaseline = abench(AWithoutHooks._from_stages(apipe._stages))
+    report("async, 3 stages: without hooks", abaseline, abaseline)
+    report("async, 3 stages: hooks disabled", abench(apipe), abaseline)
+    with tracing(discard):
+        report("async, 3 stages: tracing", abench(apipe), abaseline)
+    with tracing(Metrics()):
+        report("async, 3 stages: metrics exporter", abench(apipe), abaseline)
+    with metering(Metrics().record):
+        report("async, 3 stages: metrics meter", abench(apipe), abaseline)
+
+
+if __name__ == "__main__":
+    main()
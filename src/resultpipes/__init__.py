@@ -1,8 +1,41 @@
 from importlib.metadata import PackageNotFoundError, metadata
 
-from .catch import acatch, catch
-from .pipe import APipeable, Pipeable, failure, pipeable, success
+from .batch import batched
+from .breaker import CircuitBreaker, CircuitOpen, State
+from .bridge import LoopBridge, bridged, shared_bridge
+from .cache import CacheStats, ResultCache
+from .catch import ErrorLog, ErrorRecord, acatch, catch
+from .coalesce import SingleFlight
+from .deadline import DeadlineExceeded, remaining, with_deadline, with_timeout
+from .diskcache import DiskCache, DiskCacheStats, stable_key
+from .fanout import fail_fast, gather, race
+from .flat import AFlatPipeable, FlatPipeable, flat_map
+from .hedge import Hedge, HedgeStats
+from .limit import Bulkhead, RateLimiter, Saturated, bulkhead, rate_limiter
+from .metrics import Metrics, StageMetrics, render_prometheus
+from .pipe import (
+    APipeable,
+    Pipeable,
+    failure,
+    offload_executor,
+    pipeable,
+    success,
+)
+from .process import process_map
 from .result import Failure, Result, Success
+from .stream import amap, failures, imap, imap_chunks, partition, successes
+from .trace import (
+    Outcome,
+    Span,
+    SpanRecorder,
+    add_exporter,
+    add_meter,
+    metering,
+    remove_exporter,
+    remove_meter,
+    tracing,
+)
+from .traverse import sequence, sequence_all, traverse, traverse_all
 
 __all__ = [
     "Result",
@@ -15,6 +48,62 @@ __all__ = [
     "success",
     "failure",
     "catch",
+    "amap",
+    "process_map",
+    "offload_executor",
+    "ResultCache",
+    "CacheStats",
+    "SingleFlight",
+    "batched",
+    "gather",
+    "fail_fast",
+    "race",
+    "Hedge",
+    "HedgeStats",
+    "DeadlineExceeded",
+    "remaining",
+    "with_deadline",
+    "with_timeout",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "State",
+    "RateLimiter",
+    "Bulkhead",
+    "Saturated",
+    "rate_limiter",
+    "bulkhead",
+    "Span",
+    "Outcome",
+    "SpanRecorder",
+    "add_exporter",
+    "remove_exporter",
+    "tracing",
+    "add_meter",
+    "remove_meter",
+    "metering",
+    "Metrics",
+    "StageMetrics",
+    "render_prometheus",
+    "ErrorRecord",
+    "ErrorLog",
+    "DiskCache",
+    "DiskCacheStats",
+    "stable_key",
+    "LoopBridge",
+    "bridged",
+    "shared_bridge",
+    "imap",
+    "imap_chunks",
+    "partition",
+    "successes",
+    "failures",
+    "traverse",
+    "traverse_all",
+    "sequence",
+    "sequence_all",
+    "FlatPipeable",
+    "AFlatPipeable",
+    "flat_map",
 ]
 
 try:
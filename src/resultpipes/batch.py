@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Sequence, TypeAlias, TypeVar
+
+from .pipe import APipeable, is_async_callable
+from .result import Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+BatchFunc: TypeAlias = Callable[[list[X]], Sequence[Result[Y, E]]]
+ABatchFunc: TypeAlias = Callable[[list[X]], Awaitable[Sequence[Result[Y, E]]]]
+
+
+class _Batcher(Generic[X, Y, E]):
+    def __init__(
+        self,
+        func: BatchFunc[X, Y, E] | ABatchFunc[X, Y, E],
+        max_size: int,
+        max_delay: float,
+    ):
+        self.func = func
+        self.is_async = is_async_callable(func)
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[X, asyncio.Future[Result[Y, E]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def __call__(self, x: X) -> Result[Y, E]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Result[Y, E]] = loop.create_future()
+        self._pending.append((x, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(x, future) for x, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[X, asyncio.Future[Result[Y, E]]]]) -> None:
+        xs = [x for x, _ in batch]
+        try:
+            results: Any = self.func(xs)
+            if self.is_async:
+                results = await results
+            if len(results) != len(xs):
+                raise ValueError(
+                    f"batch function returned {len(results)} results for {len(xs)} inputs"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def batched(
+    max_size: int = 100, max_delay: float = 0.005
+) -> Callable[[BatchFunc[X, Y, E] | ABatchFunc[X, Y, E]], APipeable[X, Y, E]]:
+    """return a decorator that makes an APipeable from a function that maps a list of inputs to a list of Results.
+
+    Calls of the APipeable are collected into a batch until it has max_size inputs, or max_delay seconds have passed
+    since the first call in it; then the function is called once with the batch, and each caller gets its own Result.
+    If the function raises, so does each call in the batch.
+    """
+    if max_size < 1:
+        raise ValueError("max_size must be at least 1")
+
+    def decorator(func: BatchFunc[X, Y, E] | ABatchFunc[X, Y, E]) -> APipeable[X, Y, E]:
+        return APipeable(_Batcher(func, max_size, max_delay))
+
+    return decorator
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from collections import deque
+from enum import Enum
+from functools import wraps
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, TypeVar, overload
+
+from .pipe import APipeable, P_a, P_s, Pipeable, is_async_callable
+from .result import Failure, Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+class State(Enum):
+    """the state of a CircuitBreaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitOpen(Exception):
+    """the error of the Failure returned by a call rejected by an open CircuitBreaker."""
+
+
+class CircuitBreaker:
+    """a decorator for a function, Pipeable or APipeable that stops calling it while it is failing.
+
+    The breaker is closed to start with. It opens when at least failure_rate of the last window calls (and at least
+    min_calls) have failed; a call fails if it returns a Failure, raises, or takes longer than slow_call seconds.
+    While open, calls return Failure(CircuitOpen(name)) at once. After reset_timeout seconds, it is half-open, and lets
+    through up to half_open_calls trial calls; if they all succeed it closes, and if one fails it opens again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 20,
+        window: int = 100,
+        slow_call: float | None = None,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        name: str = "",
+        clock: Callable[[], float] = monotonic,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if half_open_calls < 1:
+            raise ValueError("half_open_calls must be at least 1")
+        if min_calls > window:
+            # the window would never hold enough calls for the breaker to open.
+            raise ValueError("min_calls must be at most window")
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.name = name
+        self.clock = clock
+        self._lock = Lock()
+        self._state = State.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = self._trial_successes = 0
+        # changed with every change of state, so that the outcome of a call is counted only in the state it
+        # started in: a slow call from before the breaker opened is not taken for a trial.
+        self._generation = 0
+
+    @property
+    def state(self) -> State:
+        with self._lock:
+            if (
+                self._state is State.OPEN
+                and self.clock() - self._opened_at >= self.reset_timeout
+            ):
+                return State.HALF_OPEN
+            return self._state
+
+    def _acquire(self) -> int | None:
+        # return the generation the call starts in, or None if it is rejected.
+        with self._lock:
+            if self._state is State.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return None
+                self._state = State.HALF_OPEN
+                self._generation += 1
+                self._trials = self._trial_successes = 0
+            if self._state is State.HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    return None
+                self._trials += 1
+            return self._generation
+
+    def _release(self, generation: int) -> None:
+        # a call was cancelled, which says nothing about the health of what it calls.
+        with self._lock:
+            if self._state is State.HALF_OPEN and generation == self._generation:
+                self._trials -= 1
+
+    def _record(self, generation: int, failed: bool) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            match self._state:
+                case State.HALF_OPEN:
+                    if failed:
+                        self._open()
+                    else:
+                        self._trial_successes += 1
+                        if self._trial_successes >= self.half_open_calls:
+                            self._state = State.CLOSED
+                            self._generation += 1
+                            self._outcomes.clear()
+                            self._failures = 0
+                case State.CLOSED:
+                    if len(self._outcomes) == self._outcomes.maxlen:
+                        self._failures -= self._outcomes[0]
+                    self._outcomes.append(failed)
+                    self._failures += failed
+                    calls = len(self._outcomes)
+                    if (
+                        calls >= self.min_calls
+                        and self._failures >= self.failure_rate * calls
+                    ):
+                        self._open()
+
+    def _open(self) -> None:
+        self._state = State.OPEN
+        self._generation += 1
+        self._opened_at = self.clock()
+
+    def _failed(self, result: Result[Any, Any], start: float) -> bool:
+        return isinstance(result, Failure) or (
+            self.slow_call is not None and self.clock() - start > self.slow_call
+        )
+
+    @overload
+    def __call__(self, f: APipeable[X, Y, E]) -> APipeable[X, Y, E | CircuitOpen]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: Pipeable[X, Y, E]) -> Pipeable[X, Y, E | CircuitOpen]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_a[X, Y, E]) -> P_a[X, Y, E | CircuitOpen]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_s[X, Y, E]) -> P_s[X, Y, E | CircuitOpen]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any) -> Any:
+        match f:
+            case APipeable():
+                return APipeable(self._wrap_async(f))
+            case Pipeable():
+                return Pipeable(self._wrap(f))
+            case _ if is_async_callable(f):
+                return self._wrap_async(f)
+            case _:
+                return self._wrap(f)
+
+    def _wrap(self, f: P_s[X, Y, E]) -> P_s[X, Y, E | CircuitOpen]:
+        @wraps(f, updated=())
+        def guarded(x: X) -> Result[Y, E | CircuitOpen]:
+            generation = self._acquire()
+            if generation is None:
+                return Failure(CircuitOpen(self.name))
+            start = self.clock()
+            try:
+                result = f(x)
+            except Exception:
+                self._record(generation, True)
+                raise
+            except BaseException:
+                self._release(generation)
+                raise
+            self._record(generation, self._failed(result, start))
+            return result
+
+        return guarded
+
+    def _wrap_async(self, f: P_a[X, Y, E]) -> P_a[X, Y, E | CircuitOpen]:
+        @wraps(f, updated=())
+        async def aguarded(x: X) -> Result[Y, E | CircuitOpen]:
+            generation = self._acquire()
+            if generation is None:
+                return Failure(CircuitOpen(self.name))
+            start = self.clock()
+            try:
+                result = await f(x)
+            except Exception:
+                self._record(generation, True)
+                raise
+            except BaseException:
+                self._release(generation)
+                raise
+            self._record(generation, self._failed(result, start))
+            return result
+
+        return aguarded
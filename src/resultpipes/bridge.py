@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+from threading import Lock, Thread, current_thread
+from typing import Any, Iterable, TypeVar
+
+from .deadline import DeadlineExceeded, with_timeout
+from .pipe import APipeable, Pipeable
+from .result import Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+R = TypeVar("R")
+
+
+def _limited(pipe: APipeable[X, Y, E], timeout: float | None) -> APipeable[X, Y, Any]:
+    return pipe if timeout is None else with_timeout(pipe, timeout)
+
+
+class LoopBridge:
+    """an event loop that runs in a thread of its own, for calling APipeables from sync code in any thread.
+
+    As the loop lives as long as the bridge, so do connection pools and the like that async stages bind to it.
+    """
+
+    def __init__(self, name: str = "resultpipes-loop"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def close(self) -> None:
+        """stop the loop, cancelling calls in progress, and wait for its thread to end."""
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self) -> LoopBridge:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def submit(
+        self, pipe: APipeable[X, Y, E], x: X, timeout: float | None = None
+    ) -> Future[Result[Y, E | DeadlineExceeded]]:
+        """start pipe(x) on the loop, and return a Future of its result.
+
+        If timeout is given, a call that takes longer is cancelled, with result Failure(DeadlineExceeded()).
+        """
+        return asyncio.run_coroutine_threadsafe(_limited(pipe, timeout)(x), self._loop)
+
+    def call(
+        self, pipe: APipeable[X, Y, E], x: X, timeout: float | None = None
+    ) -> Result[Y, E | DeadlineExceeded]:
+        """return pipe(x), run on the loop; see submit."""
+        return self._wait(self.submit(pipe, x, timeout))
+
+    def map(
+        self,
+        pipe: APipeable[X, Y, E],
+        inputs: Iterable[X],
+        concurrency: int = 16,
+        timeout: float | None = None,
+    ) -> list[Result[Y, E | DeadlineExceeded]]:
+        """return the results of pipe for each of inputs, in order, with at most concurrency calls in flight.
+
+        The whole batch is handed to the loop at once; timeout applies to each call.
+        """
+        limited = _limited(pipe, timeout)
+        items = list(inputs)
+
+        async def run() -> list[Result[Y, E | DeadlineExceeded]]:
+            return [result async for result in limited.amap(items, concurrency)]
+
+        return self._wait(asyncio.run_coroutine_threadsafe(run(), self._loop))
+
+    def _wait(self, future: Future[R]) -> R:
+        if current_thread() is self._thread:
+            future.cancel()
+            raise RuntimeError("a LoopBridge can't be waited on from its own loop")
+        try:
+            return future.result()
+        except BaseException:
+            # the caller was interrupted; don't leave the call running.
+            future.cancel()
+            raise
+
+    def sync(
+        self, pipe: APipeable[X, Y, E], timeout: float | None = None
+    ) -> Pipeable[X, Y, E | DeadlineExceeded]:
+        """return a Pipeable that calls pipe on the loop; see submit."""
+        limited = _limited(pipe, timeout)
+
+        def call(x: X) -> Result[Y, E | DeadlineExceeded]:
+            return self._wait(asyncio.run_coroutine_threadsafe(limited(x), self._loop))
+
+        return Pipeable(call)
+
+
+_shared_bridge: LoopBridge | None = None
+_shared_bridge_lock = Lock()
+
+
+def shared_bridge() -> LoopBridge:
+    """the LoopBridge used by bridged when it is not given one."""
+    global _shared_bridge
+    with _shared_bridge_lock:
+        if _shared_bridge is None:
+            _shared_bridge = LoopBridge()
+        return _shared_bridge
+
+
+def bridged(
+    pipe: APipeable[X, Y, E],
+    timeout: float | None = None,
+    bridge: LoopBridge | None = None,
+) -> Pipeable[X, Y, E | DeadlineExceeded]:
+    """return a Pipeable that calls pipe on the loop of bridge, by default shared_bridge().
+
+    If timeout is given, a call that takes longer is cancelled, with result Failure(DeadlineExceeded()).
+    """
+    return (bridge or shared_bridge()).sync(pipe, timeout)
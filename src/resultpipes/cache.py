@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import wraps
+from math import inf
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, NamedTuple, TypeVar, overload
+
+from .pipe import APipeable, P_a, P_s, Pipeable, is_async_callable
+from .result import Failure, Result, Success
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+
+
+class ResultCache:
+    """an LRU cache of the Results of a function of one argument, usable as a decorator.
+
+    Success results are kept for ttl seconds (forever if ttl is None), and Failure results for failure_ttl
+    seconds (not at all if failure_ttl is None).  At most maxsize results are kept; the least recently used
+    is evicted to make room.  Results are keyed by the argument, or by key(argument) if key is given, so
+    key can be used for unhashable arguments.  A ResultCache should be used to decorate a single function.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float | None = None,
+        failure_ttl: float | None = None,
+        key: Callable[[Any], Hashable] | None = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = inf if ttl is None else ttl
+        self.failure_ttl = failure_ttl
+        self.key = key
+        self.clock = clock
+        self._entries: OrderedDict[
+            Hashable, tuple[Result[Any, Any], float]
+        ] = OrderedDict()
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._expirations,
+                len(self._entries),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, x: Any) -> Result[Any, Any] | None:
+        """return the cached result for x, or None."""
+        k = x if self.key is None else self.key(x)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None:
+                result, expires = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(k)
+                    self._hits += 1
+                    return result
+                del self._entries[k]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    def put(self, x: Any, result: Result[Any, Any]) -> None:
+        match result:
+            case Success():
+                ttl = self.ttl
+            case Failure():
+                if self.failure_ttl is None:
+                    return
+                ttl = self.failure_ttl
+        k = x if self.key is None else self.key(x)
+        with self._lock:
+            self._entries[k] = (result, self.clock() + ttl)
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    @overload
+    def __call__(self, f: APipeable[X, Y, E]) -> APipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: Pipeable[X, Y, E]) -> Pipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_s[X, Y, E]) -> P_s[X, Y, E]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any) -> Any:
+        match f:
+            case APipeable():
+                return APipeable(self._wrap_async(f))
+            case Pipeable():
+                return Pipeable(self._wrap(f))
+            case _ if is_async_callable(f):
+                return self._wrap_async(f)
+            case _:
+                return self._wrap(f)
+
+    def _wrap(self, f: P_s[X, Y, E]) -> P_s[X, Y, E]:
+        @wraps(f, updated=())
+        def cached(x: X) -> Result[Y, E]:
+            result = self.get(x)
+            if result is None:
+                result = f(x)
+                self.put(x, result)
+            return result
+
+        return cached
+
+    def _wrap_async(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        @wraps(f, updated=())
+        async def acached(x: X) -> Result[Y, E]:
+            result = self.get(x)
+            if result is None:
+                result = await f(x)
+                self.put(x, result)
+            return result
+
+        return acached
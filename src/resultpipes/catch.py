@@ -1,8 +1,20 @@
 from __future__ import annotations
 
 from functools import wraps
-from logging import getLogger
-from typing import Any, Callable, Coroutine, ParamSpec, TypeVar, cast, overload
+from logging import Logger, getLogger
+from threading import Lock
+from time import monotonic
+from traceback import StackSummary, walk_tb
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    NamedTuple,
+    ParamSpec,
+    TypeVar,
+    cast,
+    overload,
+)
 
 from .result import Failure, Result
 
@@ -22,6 +34,83 @@ def log_exception(
     return exc
 
 
+class ErrorRecord(NamedTuple):
+    """a summary of an exception that, unlike the exception, holds no traceback, and so no frames or their locals.
+
+    where has a "file:line in function" entry for each of the innermost frames kept, the last being where the
+    exception was raised.
+    """
+
+    type: type[BaseException]
+    message: str
+    where: tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, exc: BaseException, frames: int = 1) -> ErrorRecord:
+        """return a record of exc, with entries for up to frames of its innermost frames."""
+        where: tuple[str, ...] = ()
+        if frames > 0 and exc.__traceback__ is not None:
+            summary = StackSummary.extract(
+                walk_tb(exc.__traceback__), lookup_lines=False
+            )
+            where = tuple(
+                f"{frame.filename}:{frame.lineno} in {frame.name}"
+                for frame in summary[-frames:]
+            )
+        return cls(type(exc), str(exc), where)
+
+    def __str__(self) -> str:
+        name = self.type.__qualname__
+        return f"{name}: {self.message}" if self.message else name
+
+
+class ErrorLog:
+    """a handler for catch and acatch that returns an ErrorRecord of each exception, so that the exception and its
+    frames can be freed, and logs exceptions at a limited rate.
+
+    Exceptions of the same type raised at the same place are logged, with a traceback, at most once per interval
+    seconds; the others are counted, and the count is logged with the next one that is. suppressed is the count
+    of those not logged.
+    """
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        frames: int = 1,
+        logger: Logger = log,
+        clock: Callable[[], float] = monotonic,
+        max_keys: int = 1024,
+    ):
+        self.interval = interval
+        self.frames = frames
+        self.logger = logger
+        self.clock = clock
+        self.max_keys = max_keys
+        self.suppressed = 0
+        # for each (type, where): when it was last logged, and how many have been suppressed since.
+        self._seen: dict[tuple[type[BaseException], tuple[str, ...]], list[Any]] = {}
+        self._lock = Lock()
+
+    def __call__(self, exc: Exception) -> ErrorRecord:
+        record = ErrorRecord.of(exc, self.frames)
+        key = (record.type, record.where)
+        now = self.clock()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.interval:
+                seen[1] += 1
+                self.suppressed += 1
+                return record
+            if seen is None and len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = [now, 0]
+        if seen is not None and seen[1]:
+            self.logger.error("%s (%d more suppressed)", record, seen[1], exc_info=exc)
+        else:
+            self.logger.error("%s", record, exc_info=exc)
+        return record
+
+
 @overload
 def catch() -> (
     Callable[[Callable[P, Result[S, E]]], Callable[P, Result[S, E | Exception]]]
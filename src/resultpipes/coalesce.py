@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from functools import wraps
+from typing import Any, Callable, Hashable, TypeVar, overload
+
+from .pipe import APipeable, P_a
+from .result import Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future[Any]):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """a decorator for an async function or APipeable that coalesces concurrent calls with equal arguments.
+
+    While a call is in flight, further calls with an equal argument (or equal key(argument), if key is given)
+    wait for it and get the same Result. A waiter that is cancelled does not cancel the shared call unless it
+    is the last one waiting. A SingleFlight should be used with a single event loop.
+    """
+
+    def __init__(self, key: Callable[[Any], Hashable] | None = None):
+        self.key = key
+        self._flights: dict[Hashable, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @overload
+    def __call__(self, f: APipeable[X, Y, E]) -> APipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any) -> Any:
+        if isinstance(f, APipeable):
+            return APipeable(self._wrap(f))
+        return self._wrap(f)
+
+    def _wrap(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        @wraps(f, updated=())
+        async def coalesced(x: X) -> Result[Y, E]:
+            k = x if self.key is None else self.key(x)
+            flight = self._flights.get(k)
+            if flight is None:
+                flight = self._start(k, f(x))
+            flight.waiters += 1
+            try:
+                return await asyncio.shield(flight.task)
+            finally:
+                flight.waiters -= 1
+                if flight.waiters == 0 and not flight.task.done():
+                    # the last waiter has been cancelled; later calls start a new flight.
+                    self._land(k, flight)
+                    flight.task.cancel()
+
+        return coalesced
+
+    def _start(self, k: Hashable, call: Any) -> _Flight:
+        flight = self._flights[k] = _Flight(asyncio.ensure_future(call))
+        flight.task.add_done_callback(lambda _: self._land(k, flight))
+        return flight
+
+    def _land(self, k: Hashable, flight: _Flight) -> None:
+        if self._flights.get(k) is flight:
+            del self._flights[k]
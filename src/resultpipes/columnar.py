@@ -0,0 +1,219 @@
+"""Results by the column, and pipelines of stages that work on whole arrays.
+
+This module requires numpy, which is installed with the numpy extra: pip install resultpipes[numpy].
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    TypeAlias,
+    TypeVar,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from .pipe import Route, _join, _Stage, _Stages
+from .result import Failure, Result, Success
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+Z = TypeVar("Z")
+E = TypeVar("E")
+E1 = TypeVar("E1")
+Y1 = TypeVar("Y1")
+
+
+class ResultBatch(Generic[Y, E]):
+    """a sequence of results stored by column.
+
+    values has a row for each result; ok is true for the rows that are successes, and errors maps the index
+    of each other row to its error. The values of failed rows are meaningless.
+    """
+
+    __slots__ = ("values", "ok", "errors")
+
+    def __init__(
+        self,
+        values: npt.ArrayLike,
+        ok: npt.ArrayLike | None = None,
+        errors: Mapping[int, E] | None = None,
+    ):
+        self.values: npt.NDArray[Any] = np.asarray(values)
+        if self.values.ndim == 0:
+            raise ValueError("values must have at least one dimension")
+        n = len(self.values)
+        self.ok: npt.NDArray[np.bool_] = (
+            np.ones(n, dtype=bool) if ok is None else np.asarray(ok, dtype=bool)
+        )
+        if self.ok.shape != (n,):
+            raise ValueError("ok must have a row for each value")
+        self.errors: dict[int, E] = dict(errors or {})
+        if len(self.errors) != n - np.count_nonzero(self.ok):
+            raise ValueError("errors must have an entry for each row that is not ok")
+
+    @classmethod
+    def masked(
+        cls, values: npt.ArrayLike, ok: npt.ArrayLike, error: E
+    ) -> ResultBatch[Any, E]:
+        """return a ResultBatch in which the rows where ok is false fail with error."""
+        ok = np.asarray(ok, dtype=bool)
+        return cls(values, ok, dict.fromkeys(np.flatnonzero(~ok).tolist(), error))
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Iterable[Result[Y, E]],
+        fill: Any = 0,
+        dtype: npt.DTypeLike | None = None,
+    ) -> ResultBatch[Y, E]:
+        """return a ResultBatch of results; fill is used as the value of failed rows."""
+        values = []
+        ok = []
+        errors: dict[int, E] = {}
+        for index, result in enumerate(results):
+            if isinstance(result, Success):
+                values.append(result.value)
+                ok.append(True)
+            else:
+                values.append(fill)
+                ok.append(False)
+                errors[index] = result.value
+        return cls(np.array(values, dtype=dtype), np.array(ok, dtype=bool), errors)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[Result[Y, E]]:
+        for index, (value, ok) in enumerate(
+            zip(self.values.tolist(), self.ok.tolist())
+        ):
+            yield Success(value) if ok else Failure(self.errors[index])
+
+    def to_results(self) -> list[Result[Y, E]]:
+        return list(self)
+
+    @property
+    def successes(self) -> npt.NDArray[Any]:
+        """the values of the rows that are successes."""
+        return self.values[self.ok]
+
+
+_Columnar: TypeAlias = Callable[[Any], "ResultBatch[Any, Any] | npt.ArrayLike"]
+
+
+def _common_dtype(a: npt.NDArray[Any], b: npt.NDArray[Any]) -> np.dtype[Any]:
+    # a dtype that holds the values of a and b as they are; numbers of different kinds are promoted, but
+    # numpy would turn numbers into strings alongside strings, so anything else is kept as objects.
+    if a.dtype == b.dtype:
+        return a.dtype
+    if a.dtype.kind in "biufc" and b.dtype.kind in "biufc":
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def _as_batch(
+    output: ResultBatch[Any, Any] | npt.ArrayLike, n: int
+) -> ResultBatch[Any, Any]:
+    batch = output if isinstance(output, ResultBatch) else ResultBatch(output)
+    if len(batch) != n:
+        raise ValueError(f"a vectorized stage returned {len(batch)} rows for {n}")
+    return batch
+
+
+def _apply(
+    batch: ResultBatch[Any, Any], route: Route, func: _Columnar
+) -> ResultBatch[Any, Any]:
+    # apply func to the rows of batch that route passes to it, and merge its results into the others.
+    if route is Route.RESULT:
+        return _as_batch(func(batch), len(batch))
+    rows = np.flatnonzero(batch.ok if route is Route.SUCCESS else ~batch.ok)
+    if len(rows) == len(batch):
+        # every row is passed on, so the output of func is the result.
+        if route is Route.SUCCESS:
+            return _as_batch(func(batch.values), len(batch))
+        return _as_batch(func([batch.errors[row] for row in rows.tolist()]), len(batch))
+    if len(rows) == 0:
+        return batch
+    if route is Route.SUCCESS:
+        output = _as_batch(func(batch.values[rows]), len(rows))
+        # the rows not passed on have failed, so their values don't matter.
+        values = np.zeros(
+            (len(batch),) + output.values.shape[1:], dtype=output.values.dtype
+        )
+        errors = dict(batch.errors)
+    else:
+        output = _as_batch(
+            func([batch.errors[row] for row in rows.tolist()]), len(rows)
+        )
+        values = batch.values.astype(
+            _common_dtype(batch.values, output.values), copy=True
+        )
+        errors = dict(batch.errors)
+        for row in rows.tolist():
+            del errors[row]
+    values[rows] = output.values
+    ok = batch.ok.copy()
+    ok[rows] = output.ok
+    for index, error in output.errors.items():
+        errors[int(rows[index])] = error
+    return ResultBatch(values, ok, errors)
+
+
+class VPipeable(Generic[X, Y, E]):
+    """a pipeline of vectorized stages, which take an array with a row for each input and return a ResultBatch.
+
+    A stage may instead return an array, if every row succeeds. | passes the values of the rows that have
+    succeeded to the next stage, & passes a list of the errors of the rows that have failed, and ^ passes the
+    ResultBatch. Rows are routed as Pipeable routes each result, so a VPipeable computes what the same stages
+    applied to each row would.
+    """
+
+    _stages: _Stages
+
+    def __init__(self, func: Callable[[Any], ResultBatch[Y, E] | npt.ArrayLike]):
+        self._stages = (_Stage(None, func),)
+
+    @classmethod
+    def _from_stages(cls, stages: _Stages) -> VPipeable[Any, Any, Any]:
+        pipe = cls.__new__(cls)
+        pipe._stages = stages
+        return pipe
+
+    @property
+    def func(self) -> Callable[[Any], ResultBatch[Y, E] | npt.ArrayLike]:
+        return self._stages[0].func if len(self._stages) == 1 else self
+
+    def __call__(self, x: npt.ArrayLike) -> ResultBatch[Y, E]:
+        first, *rest = self._stages
+        batch = _as_batch(first.func(x), len(x))  # type: ignore
+        for stage in rest:
+            batch = _apply(batch, stage.route, stage.func)
+        return batch
+
+    def _pipe(
+        self, route: Route, rhs: VPipeable[Any, Any, Any]
+    ) -> VPipeable[Any, Any, Any]:
+        return VPipeable._from_stages(_join(self._stages, route, rhs))  # type: ignore
+
+    def __or__(self, rhs: VPipeable[Y, Z, E1]) -> VPipeable[X, Z, E | E1]:
+        return self._pipe(Route.SUCCESS, rhs)
+
+    def __and__(self, rhs: VPipeable[E, Y1, E1]) -> VPipeable[X, Y | Y1, E1]:
+        return self._pipe(Route.FAILURE, rhs)
+
+    def __xor__(self, rhs: VPipeable[Any, Z, E1]) -> VPipeable[X, Z, E1]:
+        return self._pipe(Route.RESULT, rhs)
+
+
+def vectorized(
+    f: Callable[[Any], ResultBatch[Y, E] | npt.ArrayLike]
+) -> VPipeable[Any, Y, E]:
+    """return a VPipeable for f, which takes an array and returns a ResultBatch or array with a row for each of its rows."""
+    return VPipeable(f)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any, Awaitable, TypeVar
+
+from .pipe import APipeable, Pipeable
+from .result import Failure, Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+# the time.monotonic() time by which the current invocation must complete, if any.
+_deadline: ContextVar[float | None] = ContextVar("resultpipes_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """the error of the Failure returned when a deadline or timeout runs out."""
+
+
+def remaining() -> float | None:
+    """return the seconds left before the current deadline, or None if there is no deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - monotonic()
+
+
+async def _call(pipe: Pipeable[X, Y, E] | APipeable[X, Y, E], x: X) -> Result[Y, E]:
+    return await pipe(x) if isinstance(pipe, APipeable) else pipe(x)
+
+
+class _Raised(Exception):
+    # carries a TimeoutError raised by the call itself past wait_for, which would otherwise be taken for its own.
+    pass
+
+
+async def _guard(call: Awaitable[Result[Y, E]]) -> Result[Y, E]:
+    try:
+        return await call
+    except asyncio.TimeoutError as error:
+        raise _Raised(error)
+
+
+async def _within(
+    call: Awaitable[Result[Y, E]], seconds: float
+) -> Result[Y, E | DeadlineExceeded]:
+    try:
+        return await asyncio.wait_for(_guard(call), seconds)
+    except asyncio.TimeoutError:
+        return Failure(DeadlineExceeded())
+    except _Raised as raised:
+        error = raised.args[0]
+    # raised outside the handler, so that it does not gain _Raised as its context.
+    raise error
+
+
+def with_deadline(
+    pipe: Pipeable[X, Y, E] | APipeable[X, Y, E], seconds: float
+) -> APipeable[X, Y, E | DeadlineExceeded]:
+    """return an APipeable that gives each invocation of pipe a deadline seconds from its start.
+
+    The deadline is seen by every stage of pipe, through remaining() and with_timeout; an earlier deadline set
+    by an enclosing invocation is kept. If the deadline passes, pipe is cancelled and the result is
+    Failure(DeadlineExceeded()). A sync Pipeable is not interrupted.
+    """
+
+    async def run(x: X) -> Result[Y, E | DeadlineExceeded]:
+        deadline = monotonic() + seconds
+        current = _deadline.get()
+        if current is not None:
+            deadline = min(current, deadline)
+        # the task that wait_for creates copies the context, so it must be set first.
+        token = _deadline.set(deadline)
+        try:
+            return await _within(_call(pipe, x), deadline - monotonic())
+        finally:
+            _deadline.reset(token)
+
+    return APipeable(run)
+
+
+def with_timeout(
+    pipe: Pipeable[X, Y, E] | APipeable[X, Y, E], seconds: float | None = None
+) -> APipeable[X, Y, E | DeadlineExceeded]:
+    """return an APipeable that runs pipe for at most seconds, or until the current deadline if that is sooner.
+
+    If no time is left, pipe is not started. If time runs out, pipe is cancelled. Either way, the result is
+    Failure(DeadlineExceeded()), so that & can route it to a fallback. A sync Pipeable is not interrupted.
+    """
+
+    async def run(x: X) -> Result[Y, E | DeadlineExceeded]:
+        limits = [limit for limit in (seconds, remaining()) if limit is not None]
+        if not limits:
+            return await _call(pipe, x)
+        limit = min(limits)
+        if limit <= 0:
+            return Failure(DeadlineExceeded())
+        return await _within(_call(pipe, x), limit)
+
+    return APipeable(run)
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import sqlite3
+from contextlib import contextmanager
+from functools import wraps
+from hashlib import blake2b
+from logging import getLogger
+from threading import Lock, local
+from time import time
+from typing import Any, Callable, Iterator, NamedTuple, TypeVar, overload
+
+from .pipe import APipeable, P_a, P_s, Pipeable, is_async_callable
+from .result import Failure, Result, Success
+
+log = getLogger(__name__)
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    ok INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals VALUES (0, 0);
+"""
+
+
+class DiskCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+def stable_key(x: Any) -> bytes:
+    """return bytes that identify x and are the same in every process and Python run.
+
+    Numbers, strings, bytes, None, and tuples, lists, dicts, sets and frozensets of them are encoded
+    directly; other objects are pickled, which is stable for most objects but not, for example, for
+    objects that hold sets.
+    """
+    match x:
+        case None | bool() | int() | float() | complex() | str():
+            return f"{type(x).__name__}:{x!r}".encode()
+        case bytes():
+            return b"bytes:" + x
+        case tuple() | list():
+            parts = [stable_key(item) for item in x]
+        case dict():
+            parts = sorted(
+                _framed([stable_key(k), stable_key(v)]) for k, v in x.items()
+            )
+        case set() | frozenset():
+            parts = sorted(stable_key(item) for item in x)
+        case _:
+            return b"pickle:" + pickle.dumps(x, protocol=4)
+    return f"{type(x).__name__}[".encode() + _framed(parts)
+
+
+def _framed(parts: list[bytes]) -> bytes:
+    # prefix each part with its length, so that nesting can't be confused.
+    return b"".join(len(part).to_bytes(8, "big") + part for part in parts)
+
+
+class DiskCache:
+    """a cache of the Results of a function of one argument in an sqlite database at path, usable as a decorator.
+
+    Results are keyed by a hash of version and the argument (or key(argument) if key is given; see stable_key),
+    so changing version sets aside the results of an earlier version of the function. Success values are stored
+    pickled, as are Failure values if failures is true. When the stored values take more than max_bytes, the
+    least recently used are evicted; the time of use is updated at most once per touch_interval seconds, so that
+    hits rarely write. The database may be shared by threads and processes; a DiskCache should be used to
+    decorate a single function. Errors of the database are logged, and treated as misses.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        version: str = "",
+        max_bytes: int = 2**30,
+        failures: bool = False,
+        key: Callable[[Any], Any] | None = None,
+        timeout: float = 30.0,
+        touch_interval: float = 60.0,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.path = os.fspath(path)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.failures = failures
+        self.key = key
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+        self._local = local()
+        self._stats_lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared by threads, or used in a child process after a fork.
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _key(self, x: Any) -> bytes:
+        digest = blake2b(self.version.encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(stable_key(x if self.key is None else self.key(x)))
+        return digest.digest()
+
+    @property
+    def stats(self) -> DiskCacheStats:
+        connection = self._connection()
+        (entries,) = connection.execute("SELECT count(*) FROM results").fetchone()
+        (size,) = connection.execute("SELECT bytes FROM totals").fetchone()
+        with self._stats_lock:
+            return DiskCacheStats(
+                self._hits, self._misses, self._evictions, entries, size
+            )
+
+    def clear(self) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM results")
+            connection.execute("UPDATE totals SET bytes = 0")
+
+    def get(self, x: Any) -> Result[Any, Any] | None:
+        """return the cached result for x, or None."""
+        result: Result[Any, Any] | None = None
+        try:
+            k = self._key(x)
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT ok, value, accessed FROM results WHERE key = ?", (k,)
+            ).fetchone()
+            if row is not None:
+                ok, value, accessed = row
+                value = pickle.loads(value)
+                result = Success(value) if ok else Failure(value)
+                now = time()
+                if now - accessed > self.touch_interval:
+                    connection.execute(
+                        "UPDATE results SET accessed = ? WHERE key = ?", (now, k)
+                    )
+        except Exception:
+            log.warning("disk cache %s: get failed", self.path, exc_info=True)
+        with self._stats_lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def put(self, x: Any, result: Result[Any, Any]) -> None:
+        if isinstance(result, Failure) and not self.failures:
+            return
+        try:
+            k = self._key(x)
+            value = pickle.dumps(result.value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(value) > self.max_bytes:
+                # it could only be stored by evicting everything else, and then itself.
+                return
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT size FROM results WHERE key = ?", (k,)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    (k, isinstance(result, Success), value, len(value), time()),
+                )
+                connection.execute(
+                    "UPDATE totals SET bytes = bytes + ?",
+                    (len(value) - (row[0] if row else 0),),
+                )
+                evictions = self._evict(connection)
+        except Exception:
+            log.warning("disk cache %s: put failed", self.path, exc_info=True)
+            return
+        if evictions:
+            with self._stats_lock:
+                self._evictions += evictions
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        # delete the least recently used results until the rest fit in max_bytes.
+        (size,) = connection.execute("SELECT bytes FROM totals").fetchone()
+        evictions = 0
+        while size > self.max_bytes:
+            rows = connection.execute(
+                "SELECT key, size FROM results ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                # the total has drifted from the results; there is nothing left to evict.
+                size = 0
+                break
+            for k, n in rows:
+                connection.execute("DELETE FROM results WHERE key = ?", (k,))
+                size -= n
+                evictions += 1
+                if size <= self.max_bytes:
+                    break
+        connection.execute("UPDATE totals SET bytes = ?", (size,))
+        return evictions
+
+    @overload
+    def __call__(self, f: APipeable[X, Y, E]) -> APipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: Pipeable[X, Y, E]) -> Pipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_s[X, Y, E]) -> P_s[X, Y, E]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any) -> Any:
+        match f:
+            case APipeable():
+                return APipeable(self._wrap_async(f))
+            case Pipeable():
+                return Pipeable(self._wrap(f))
+            case _ if is_async_callable(f):
+                return self._wrap_async(f)
+            case _:
+                return self._wrap(f)
+
+    def _wrap(self, f: P_s[X, Y, E]) -> P_s[X, Y, E]:
+        @wraps(f, updated=())
+        def cached(x: X) -> Result[Y, E]:
+            result = self.get(x)
+            if result is None:
+                result = f(x)
+                self.put(x, result)
+            return result
+
+        return cached
+
+    def _wrap_async(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        # the database is used from a thread, so that waiting for a lock held by another process does not
+        # block the event loop.
+        @wraps(f, updated=())
+        async def acached(x: X) -> Result[Y, E]:
+            result = await asyncio.to_thread(self.get, x)
+            if result is None:
+                result = await f(x)
+                await asyncio.to_thread(self.put, x, result)
+            return result
+
+        return acached
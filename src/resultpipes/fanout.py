@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Never, TypeVar
+
+from .pipe import APipeable, Pipeable
+from .result import Failure, Result, Success
+
+X = TypeVar("X")
+
+
+async def _call(pipe: Pipeable[X, Any, Any] | APipeable[X, Any, Any], x: X) -> Any:
+    return await pipe(x) if isinstance(pipe, APipeable) else pipe(x)
+
+
+async def _run(
+    pipes: tuple[Pipeable[X, Any, Any] | APipeable[X, Any, Any], ...],
+    x: X,
+    stop: Callable[[Result[Any, Any]], bool],
+) -> tuple[Result[Any, Any] | None, list[Result[Any, Any]]]:
+    # Run pipes concurrently on x. Return the first result for which stop is true, or None and the results of all pipes.
+    # Pipes still running when this returns or raises are cancelled.
+    tasks = [asyncio.ensure_future(_call(pipe, x)) for pipe in pipes]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if stop(result):
+                    return result, []
+        return None, [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def gather(
+    *pipes: Pipeable[X, Any, Any] | APipeable[X, Any, Any]
+) -> APipeable[X, list[Result[Any, Any]], Never]:
+    """return an APipeable that runs pipes concurrently on its input, with result Success(list of their results)."""
+
+    async def gathered(x: X) -> Result[list[Result[Any, Any]], Never]:
+        _, results = await _run(pipes, x, lambda result: False)
+        return Success(results)
+
+    return APipeable(gathered)
+
+
+def fail_fast(
+    *pipes: Pipeable[X, Any, Any] | APipeable[X, Any, Any]
+) -> APipeable[X, list[Any], Any]:
+    """return an APipeable that runs pipes concurrently on its input.
+
+    Its result is Success(list of the values of their results) if all succeed; otherwise, it is the first
+    Failure, and pipes still running are cancelled.
+    """
+
+    async def all_succeed(x: X) -> Result[list[Any], Any]:
+        failure, results = await _run(
+            pipes, x, lambda result: isinstance(result, Failure)
+        )
+        if failure is not None:
+            return failure
+        return Success([result.value for result in results])
+
+    return APipeable(all_succeed)
+
+
+def race(
+    *pipes: Pipeable[X, Any, Any] | APipeable[X, Any, Any]
+) -> APipeable[X, Any, list[Any]]:
+    """return an APipeable that runs pipes concurrently on its input; a concurrent form of &.
+
+    Its result is the first Success, and pipes still running are cancelled. If all fail, it is Failure(list of
+    their errors).
+    """
+
+    async def first_success(x: X) -> Result[Any, list[Any]]:
+        success, results = await _run(
+            pipes, x, lambda result: isinstance(result, Success)
+        )
+        if success is not None:
+            return success
+        return Failure([result.value for result in results])
+
+    return APipeable(first_success)
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections import deque
+from contextlib import aclosing
+from functools import partial
+from itertools import chain
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    TypeAlias,
+    TypeVar,
+    overload,
+)
+
+from .pipe import (
+    _ACCEPTS,
+    APipeable,
+    Pipeable,
+    Route,
+    _describe,
+    _explain,
+    _join,
+    _Stage,
+    _Stages,
+)
+from .result import Result
+from .stream import _DONE, _from_iterable, _Raised, as_async_iterator
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+Z = TypeVar("Z")
+E = TypeVar("E")
+E1 = TypeVar("E1")
+Y1 = TypeVar("Y1")
+W = TypeVar("W")
+
+G_s: TypeAlias = Callable[[X], Iterable[Result[Y, E]]]
+G_a: TypeAlias = Callable[[X], AsyncIterable[Result[Y, E]]]
+
+
+def _is_async_generator_function(obj: Any) -> bool:
+    while isinstance(obj, partial):
+        obj = obj.func
+    return inspect.isasyncgenfunction(obj) or (
+        callable(obj) and inspect.isasyncgenfunction(obj.__call__)
+    )
+
+
+class _Expand:
+    # the func of a stage that yields any number of results for each value passed to it; the stages after it
+    # run on each of those results. At most concurrency of them are in flight at once in an async pipeline.
+    def __init__(self, func: Callable[[Any], Any], concurrency: int = 1):
+        self.func = func
+        self.concurrency = concurrency
+
+    def __call__(self, x: Any) -> Any:
+        return self.func(x)
+
+
+_Pipes: TypeAlias = "Pipeable[Any, Any, Any] | APipeable[Any, Any, Any] | FlatPipeable[Any, Any, Any] | AFlatPipeable[Any, Any, Any]"
+
+
+def _join_flat(lhs: _Stages, route: Route, rhs: _Pipes) -> _Stages:
+    # like _join; a flat pipeline that can't be spliced is kept as a single expanding stage.
+    if not isinstance(rhs, (FlatPipeable, AFlatPipeable)):
+        return _join(lhs, route, rhs)
+    stages = rhs._stages
+    accepts = _ACCEPTS[route]
+    if accepts is None or all(stage.accepts is accepts for stage in stages[1:]):
+        return lhs + (stages[0]._replace(accepts=accepts),) + stages[1:]
+    return lhs + (_Stage(accepts, _Expand(rhs), isinstance(rhs, AFlatPipeable)),)
+
+
+def _from_stages(stages: _Stages) -> Any:
+    if any(stage.is_async for stage in stages):
+        return AFlatPipeable._from_stages(stages)
+    return FlatPipeable._from_stages(stages)
+
+
+def _flow(stages: _Stages, start: int, result: Any) -> Iterator[Any]:
+    # run stages from start on result, yielding the results of each branch at an expanding stage in turn.
+    for index in range(start, len(stages)):
+        accepts, func, _ = stages[index]
+        if accepts is None:
+            arg = result
+        elif isinstance(result, accepts):
+            arg = result.value
+        else:
+            continue
+        if isinstance(func, _Expand):
+            for child in func(arg):
+                yield from _flow(stages, index + 1, child)
+            return
+        result = func(arg)
+    yield result
+
+
+async def _aflow(stages: _Stages, start: int, result: Any) -> AsyncGenerator[Any, None]:
+    # _flow for stages that may be async.
+    for index in range(start, len(stages)):
+        accepts, func, is_async = stages[index]
+        if accepts is None:
+            arg = result
+        elif isinstance(result, accepts):
+            arg = result.value
+        else:
+            continue
+        if not isinstance(func, _Expand):
+            result = func(arg)
+            if is_async:
+                result = await result
+            continue
+        children = func(arg)
+        async with aclosing(
+            children if is_async else _from_iterable(children)
+        ) as items:
+            if func.concurrency == 1:
+                async for child in items:
+                    async with aclosing(_aflow(stages, index + 1, child)) as results:
+                        async for result in results:
+                            yield result
+                return
+
+            async with aclosing(
+                _branches(stages, index + 1, items, func.concurrency)
+            ) as results:
+                async for result in results:
+                    yield result
+        return
+    yield result
+
+
+async def _branches(
+    stages: _Stages, start: int, items: AsyncIterator[Any], concurrency: int
+) -> AsyncGenerator[Any, None]:
+    # run stages from start on up to concurrency of items at once, yielding the results of each in turn. Each
+    # branch puts its results in a queue of one, so at most one result per branch is held ahead of the consumer.
+    pending: deque[tuple[asyncio.Queue[Any], asyncio.Future[None]]] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    child = await anext(items)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    queue: asyncio.Queue[Any] = asyncio.Queue(1)
+                    pending.append(
+                        (
+                            queue,
+                            asyncio.ensure_future(_branch(stages, start, child, queue)),
+                        )
+                    )
+            if not pending:
+                return
+            queue = pending[0][0]
+            while (item := await queue.get()) is not _DONE:
+                if isinstance(item, _Raised):
+                    raise item.exc
+                yield item
+            pending.popleft()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+async def _branch(
+    stages: _Stages, start: int, child: Any, queue: asyncio.Queue[Any]
+) -> None:
+    try:
+        async with aclosing(_aflow(stages, start, child)) as results:
+            async for result in results:
+                await queue.put(result)
+    except Exception as exc:
+        await queue.put(_Raised(exc))
+        return
+    await queue.put(_DONE)
+
+
+def _explain_flat(stages: _Stages, indent: str = "") -> list[str]:
+    lines = []
+    for stage in stages:
+        func = stage.func
+        if not isinstance(func, _Expand):
+            lines.extend(_explain((stage,), indent))
+        elif isinstance(func.func, (FlatPipeable, AFlatPipeable)):
+            kind = "async" if stage.is_async else "sync"
+            lines.append(f"{indent}{stage.route.value} flat pipeline ({kind})")
+            lines.extend(_explain_flat(func.func._stages, indent + "    "))
+        else:
+            kind = "async" if stage.is_async else "sync"
+            if func.concurrency > 1:
+                kind += f", concurrency {func.concurrency}"
+            lines.append(
+                f"{indent}{stage.route.value} {_describe(func.func)} ({kind} generator)"
+            )
+    return lines
+
+
+class FlatPipeable(Generic[X, Y, E]):
+    """a pipeline that yields any number of results for each input, made with flat_map.
+
+    The stages composed after an expanding stage run on each of the results it yields, as they are yielded,
+    so no list of them is built.
+    """
+
+    _stages: _Stages
+
+    def __init__(self, func: G_s[X, Y, E], concurrency: int = 1):
+        self._stages = (_Stage(None, _Expand(func, concurrency)),)
+
+    @classmethod
+    def _from_stages(cls, stages: _Stages) -> FlatPipeable[Any, Any, Any]:
+        pipe = cls.__new__(cls)
+        pipe._stages = stages
+        return pipe
+
+    def __call__(self, x: X) -> Iterator[Result[Y, E]]:
+        return _flow(self._stages, 0, x)
+
+    def imap(self, inputs: Iterable[X]) -> Iterator[Result[Y, E]]:
+        """apply self to each of inputs lazily, yielding all of their results in turn."""
+        return chain.from_iterable(map(self, inputs))
+
+    def explain(self) -> str:
+        """return a description of the stages of self, one per line; see Pipeable.explain."""
+        return "\n".join(_explain_flat(self._stages))
+
+    def _pipe(self, route: Route, rhs: _Pipes) -> Any:
+        return _from_stages(_join_flat(self._stages, route, rhs))
+
+    def _rpipe(self, route: Route, lhs: Any) -> Any:
+        if not isinstance(lhs, (Pipeable, APipeable)):
+            return NotImplemented
+        return _from_stages(_join_flat(lhs._stages, route, self))
+
+    @overload
+    def __or__(
+        self, rhs: Pipeable[Y, Z, E1] | FlatPipeable[Y, Z, E1]
+    ) -> FlatPipeable[X, Z, E | E1]:
+        ...  # pragma: no cover
+
+    @overload
+    def __or__(
+        self, rhs: APipeable[Y, Z, E1] | AFlatPipeable[Y, Z, E1]
+    ) -> AFlatPipeable[X, Z, E | E1]:
+        ...  # pragma: no cover
+
+    def __or__(self, rhs: _Pipes) -> Any:
+        return self._pipe(Route.SUCCESS, rhs)
+
+    @overload
+    def __and__(
+        self, rhs: Pipeable[E, Y1, E1] | FlatPipeable[E, Y1, E1]
+    ) -> FlatPipeable[X, Y | Y1, E1]:
+        ...  # pragma: no cover
+
+    @overload
+    def __and__(
+        self, rhs: APipeable[E, Y1, E1] | AFlatPipeable[E, Y1, E1]
+    ) -> AFlatPipeable[X, Y | Y1, E1]:
+        ...  # pragma: no cover
+
+    def __and__(self, rhs: _Pipes) -> Any:
+        return self._pipe(Route.FAILURE, rhs)
+
+    @overload
+    def __xor__(
+        self,
+        rhs: Pipeable[Result[Y, E], Z, E1] | FlatPipeable[Result[Y, E], Z, E1],
+    ) -> FlatPipeable[X, Z, E1]:
+        ...  # pragma: no cover
+
+    @overload
+    def __xor__(
+        self,
+        rhs: APipeable[Result[Y, E], Z, E1] | AFlatPipeable[Result[Y, E], Z, E1],
+    ) -> AFlatPipeable[X, Z, E1]:
+        ...  # pragma: no cover
+
+    def __xor__(self, rhs: _Pipes) -> Any:
+        return self._pipe(Route.RESULT, rhs)
+
+    @overload
+    def __ror__(self, lhs: Pipeable[W, X, E1]) -> FlatPipeable[W, Y, E | E1]:
+        ...  # pragma: no cover
+
+    @overload
+    def __ror__(self, lhs: APipeable[W, X, E1]) -> AFlatPipeable[W, Y, E | E1]:
+        ...  # pragma: no cover
+
+    def __ror__(self, lhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]) -> Any:
+        return self._rpipe(Route.SUCCESS, lhs)
+
+    def __rand__(self, lhs: Pipeable[Any, Any, X] | APipeable[Any, Any, X]) -> Any:
+        return self._rpipe(Route.FAILURE, lhs)
+
+    def __rxor__(self, lhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]) -> Any:
+        return self._rpipe(Route.RESULT, lhs)
+
+
+class AFlatPipeable(Generic[X, Y, E]):
+    """a FlatPipeable with async stages; calling it returns an async iterator of the results for an input."""
+
+    _stages: _Stages
+
+    def __init__(self, func: G_a[X, Y, E], concurrency: int = 1):
+        self._stages = (_Stage(None, _Expand(func, concurrency), True),)
+
+    @classmethod
+    def _from_stages(cls, stages: _Stages) -> AFlatPipeable[Any, Any, Any]:
+        pipe = cls.__new__(cls)
+        pipe._stages = stages
+        return pipe
+
+    def __call__(self, x: X) -> AsyncGenerator[Result[Y, E], None]:
+        return _aflow(self._stages, 0, x)
+
+    def amap(
+        self, inputs: Iterable[X] | AsyncIterable[X]
+    ) -> AsyncIterator[Result[Y, E]]:
+        """apply self to each of inputs in turn, yielding all of their results."""
+        return self._amap(as_async_iterator(inputs))
+
+    async def _amap(self, items: AsyncIterator[X]) -> AsyncIterator[Result[Y, E]]:
+        async for x in items:
+            async with aclosing(self(x)) as results:
+                async for result in results:
+                    yield result
+
+    def explain(self) -> str:
+        """return a description of the stages of self, one per line; see Pipeable.explain."""
+        return "\n".join(_explain_flat(self._stages))
+
+    def _pipe(self, route: Route, rhs: _Pipes) -> Any:
+        return AFlatPipeable._from_stages(_join_flat(self._stages, route, rhs))
+
+    def _rpipe(self, route: Route, lhs: Any) -> Any:
+        if not isinstance(lhs, (Pipeable, APipeable)):
+            return NotImplemented
+        return AFlatPipeable._from_stages(_join_flat(lhs._stages, route, self))
+
+    def __or__(
+        self,
+        rhs: Pipeable[Y, Z, E1]
+        | APipeable[Y, Z, E1]
+        | FlatPipeable[Y, Z, E1]
+        | AFlatPipeable[Y, Z, E1],
+    ) -> AFlatPipeable[X, Z, E | E1]:
+        return self._pipe(Route.SUCCESS, rhs)
+
+    def __and__(
+        self,
+        rhs: Pipeable[E, Y1, E1]
+        | APipeable[E, Y1, E1]
+        | FlatPipeable[E, Y1, E1]
+        | AFlatPipeable[E, Y1, E1],
+    ) -> AFlatPipeable[X, Y | Y1, E1]:
+        return self._pipe(Route.FAILURE, rhs)
+
+    def __xor__(
+        self,
+        rhs: Pipeable[Result[Y, E], Z, E1]
+        | APipeable[Result[Y, E], Z, E1]
+        | FlatPipeable[Result[Y, E], Z, E1]
+        | AFlatPipeable[Result[Y, E], Z, E1],
+    ) -> AFlatPipeable[X, Z, E1]:
+        return self._pipe(Route.RESULT, rhs)
+
+    def __ror__(
+        self, lhs: Pipeable[W, X, E1] | APipeable[W, X, E1]
+    ) -> AFlatPipeable[W, Y, E | E1]:
+        return self._rpipe(Route.SUCCESS, lhs)
+
+    def __rand__(self, lhs: Pipeable[Any, Any, X] | APipeable[Any, Any, X]) -> Any:
+        return self._rpipe(Route.FAILURE, lhs)
+
+    def __rxor__(self, lhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]) -> Any:
+        return self._rpipe(Route.RESULT, lhs)
+
+
+@overload
+def flat_map(f: G_a[X, Y, E], concurrency: int = 1) -> AFlatPipeable[X, Y, E]:
+    ...  # pragma: no cover
+
+
+@overload
+def flat_map(f: G_s[X, Y, E], concurrency: int = 1) -> FlatPipeable[X, Y, E]:
+    ...  # pragma: no cover
+
+
+@overload
+def flat_map(*, concurrency: int) -> Callable[[Any], Any]:
+    ...  # pragma: no cover
+
+
+def flat_map(
+    f: G_s[X, Y, E] | G_a[X, Y, E] | None = None, concurrency: int = 1
+) -> FlatPipeable[X, Y, E] | AFlatPipeable[X, Y, E] | Callable[[Any], Any]:
+    """return a FlatPipeable for a generator function f, which yields any number of results for its argument,
+    or an AFlatPipeable if f is an async generator function.
+
+    In a pipeline with async stages, the stages after f run on at most concurrency of its results at once,
+    each holding at most one result of its own ahead of the consumer, and their results are yielded in order;
+    with concurrency=1, f is resumed only as its results are consumed.
+    Without f, return a decorator.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if f is None:
+        return partial(flat_map, concurrency=concurrency)
+    if _is_async_generator_function(f):
+        return AFlatPipeable(f, concurrency)  # type: ignore
+    return FlatPipeable(f, concurrency)  # type: ignore
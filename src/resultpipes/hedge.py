@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from functools import wraps
+from typing import Any, NamedTuple, TypeVar, overload
+
+from .pipe import APipeable, P_a
+from .result import Result, Success
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+class HedgeStats(NamedTuple):
+    calls: int
+    hedged: int
+    hedge_wins: int
+    delay: float
+
+
+class Hedge:
+    """a decorator for an async function or APipeable that hedges slow calls.
+
+    If a call has not completed after delay seconds, a second, identical call is started, and the first Success
+    from either is returned; the other call is cancelled. If both fail, the first Failure is returned.
+    If percentile is given, the delay is instead that percentile of the latencies of recent calls, once there
+    are min_samples of them. At most max_extra (as a fraction of all calls) are hedged.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.05,
+        percentile: float | None = None,
+        max_extra: float = 0.1,
+        min_samples: int = 20,
+        window: int = 1000,
+    ):
+        if percentile is not None and not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 <= max_extra <= 1:
+            raise ValueError("max_extra must be between 0 and 1")
+        self.delay = delay
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.min_samples = min_samples
+        # tokens accrue at max_extra per call, up to what 100 calls would earn, so that hedges stay near
+        # max_extra of calls even after a quiet period; a hedge spends one. The bucket starts empty, so the
+        # first calls are not all hedged.
+        self._max_tokens = max(1.0, 100 * max_extra)
+        self._tokens = 0.0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._calls = self._hedged = self._hedge_wins = 0
+
+    @property
+    def stats(self) -> HedgeStats:
+        return HedgeStats(self._calls, self._hedged, self._hedge_wins, self.delay)
+
+    @overload
+    def __call__(self, f: APipeable[X, Y, E]) -> APipeable[X, Y, E]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any) -> Any:
+        if isinstance(f, APipeable):
+            return APipeable(self._wrap(f))
+        return self._wrap(f)
+
+    def _wrap(self, f: P_a[X, Y, E]) -> P_a[X, Y, E]:
+        @wraps(f, updated=())
+        async def hedged(x: X) -> Result[Y, E]:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            self._calls += 1
+            self._tokens = min(self._tokens + self.max_extra, self._max_tokens)
+            tasks: list[asyncio.Future[Result[Y, E]]] = [asyncio.ensure_future(f(x))]
+
+            # only the primary call's latency is observed: a hedged call's would cap it near the delay,
+            # which would then only ever shrink.
+            def observe(task: asyncio.Future[Result[Y, E]]) -> None:
+                if not task.cancelled():
+                    self._observe(loop.time() - start)
+
+            tasks[0].add_done_callback(observe)
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=self.delay)
+                if done or self._tokens < 1:
+                    result = await tasks[0]
+                else:
+                    self._tokens -= 1
+                    self._hedged += 1
+                    tasks.append(asyncio.ensure_future(f(x)))
+                    result, winner = await _first_success(tasks)
+                    if winner == 1:
+                        self._hedge_wins += 1
+            finally:
+                for task in tasks:
+                    task.cancel()
+            return result
+
+        return hedged
+
+    def _observe(self, latency: float) -> None:
+        if self.percentile is None:
+            return
+        self._latencies.append(latency)
+        # recomputing the percentile on every call would cost a sort per call.
+        if len(self._latencies) >= self.min_samples and self._calls % 16 == 0:
+            latencies = sorted(self._latencies)
+            index = int(len(latencies) * self.percentile / 100)
+            self.delay = latencies[min(index, len(latencies) - 1)]
+
+
+async def _first_success(
+    tasks: list[asyncio.Future[Result[Y, E]]],
+) -> tuple[Result[Y, E], int]:
+    # return the first Success, or the first result if none succeed, and the index of its task.
+    first: tuple[Result[Y, E], int] | None = None
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            result = task.result()
+            if isinstance(result, Success):
+                return result, tasks.index(task)
+            if first is None:
+                first = result, tasks.index(task)
+    assert first is not None
+    return first
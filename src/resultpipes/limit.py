@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import wraps
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, TypeVar, overload
+
+from .pipe import APipeable, P_a
+from .result import Failure, Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+class Saturated(Exception):
+    """the error of the Failure returned when a limit is reached and the caller would not wait."""
+
+
+class _Limit(ABC):
+    name: str
+
+    @abstractmethod
+    async def _acquire(self, max_wait: float | None) -> bool:
+        """wait for at most max_wait seconds to proceed, and return whether the call may."""
+
+    def _release(self) -> None:
+        pass
+
+    @overload
+    def __call__(
+        self, f: APipeable[X, Y, E], max_wait: float | None = None
+    ) -> APipeable[X, Y, E | Saturated]:
+        ...  # pragma: no cover
+
+    @overload
+    def __call__(
+        self, f: P_a[X, Y, E], max_wait: float | None = None
+    ) -> P_a[X, Y, E | Saturated]:
+        ...  # pragma: no cover
+
+    def __call__(self, f: Any, max_wait: float | None = None) -> Any:
+        """wrap f, an async function or APipeable, so that calls are subject to this limit.
+
+        A call waits for at most max_wait seconds (as long as it takes, if max_wait is None) and then, if it still
+        can't proceed, returns Failure(Saturated(name)). max_wait=0 fails fast.
+        """
+        if isinstance(f, APipeable):
+            return APipeable(self._wrap(f, max_wait))
+        return self._wrap(f, max_wait)
+
+    def _wrap(
+        self, f: P_a[X, Y, E], max_wait: float | None
+    ) -> P_a[X, Y, E | Saturated]:
+        @wraps(f, updated=())
+        async def limited(x: X) -> Result[Y, E | Saturated]:
+            if not await self._acquire(max_wait):
+                return Failure(Saturated(self.name))
+            try:
+                return await f(x)
+            finally:
+                self._release()
+
+        return limited
+
+
+class RateLimiter(_Limit):
+    """a token bucket that allows rate calls per second on average, and bursts of up to burst calls."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        name: str = "",
+        clock: Callable[[], float] = monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self.clock = clock
+        self.rejected = 0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = Lock()
+
+    def _reserve(self, max_wait: float | None) -> float | None:
+        # take a token, and return how long to wait for it; tokens below zero are reserved by waiting calls.
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            if max_wait is not None and delay > max_wait:
+                self.rejected += 1
+                return None
+            self._tokens -= 1
+            return delay
+
+    async def _acquire(self, max_wait: float | None) -> bool:
+        delay = self._reserve(max_wait)
+        if delay is None:
+            return False
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._tokens += 1
+                raise
+        return True
+
+
+class _Waiter:
+    # a call waiting for a slot of a Bulkhead, on the event loop it runs in; granted is set under the lock when
+    # a slot is handed to it.
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future[None] = loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Bulkhead(_Limit):
+    """a limit of limit calls in progress at once.
+
+    A Bulkhead is not bound to an event loop: calls on any loop, in any thread, share its limit, and waiting calls
+    get slots in the order they asked for them.
+    """
+
+    def __init__(self, limit: int, name: str = ""):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.name = name
+        self.rejected = 0
+        self.in_use = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = Lock()
+
+    async def _acquire(self, max_wait: float | None) -> bool:
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return True
+            if max_wait is not None and max_wait <= 0:
+                self.rejected += 1
+                return False
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter.future, max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    if isinstance(exc, asyncio.TimeoutError):
+                        self.rejected += 1
+            if isinstance(exc, asyncio.CancelledError):
+                if granted:
+                    self._release()
+                raise
+            # a slot handed over as the wait ran out is taken all the same.
+            return granted
+        return True
+
+    def _release(self) -> None:
+        # hand the slot to the first waiter whose loop is still running, or else free it.
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    continue
+                waiter.granted = True
+                return
+            self.in_use -= 1
+
+
+_limits: dict[str, _Limit] = {}
+_limits_lock = Lock()
+
+
+def _named(name: str, factory: Callable[[], _Limit], cls: type[_Limit]) -> Any:
+    with _limits_lock:
+        limit = _limits.get(name)
+        if limit is None:
+            limit = _limits[name] = factory()
+        elif not isinstance(limit, cls):
+            raise ValueError(f"limit {name!r} is a {type(limit).__name__}")
+        return limit
+
+
+def rate_limiter(name: str, rate: float, burst: int = 1) -> RateLimiter:
+    """return the RateLimiter with this name, creating it with rate and burst if there isn't one."""
+    limiter: RateLimiter = _named(
+        name, lambda: RateLimiter(rate, burst, name), RateLimiter
+    )
+    if (limiter.rate, limiter.burst) != (rate, burst):
+        raise ValueError(
+            f"rate limiter {name!r} has rate {limiter.rate}, burst {limiter.burst}"
+        )
+    return limiter
+
+
+def bulkhead(name: str, limit: int) -> Bulkhead:
+    """return the Bulkhead with this name, creating it with limit if there isn't one."""
+    bulkhead: Bulkhead = _named(name, lambda: Bulkhead(limit, name), Bulkhead)
+    if bulkhead.limit != limit:
+        raise ValueError(f"bulkhead {name!r} has limit {bulkhead.limit}")
+    return bulkhead
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from threading import Lock, local
+from typing import Any, Mapping, NamedTuple, Sequence
+
+from .result import Failure, Success
+from .trace import Outcome, Span
+
+# the upper bounds, in seconds, of the latency buckets used by default; there is also a bucket for any longer.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class StageMetrics(NamedTuple):
+    """totals for the spans with one name.
+
+    failures counts Failure results, and errors raised exceptions, by the type name of the error. counts[i] is
+    the number of calls that took at most buckets[i] seconds, and longer than buckets[i - 1]; the last count is
+    of calls longer than every bucket.
+    """
+
+    calls: int
+    successes: int
+    failures: dict[str, int]
+    errors: dict[str, int]
+    buckets: tuple[float, ...]
+    counts: tuple[int, ...]
+    total_seconds: float
+
+
+class _Counts:
+    __slots__ = ("successes", "failures", "errors", "counts", "total_seconds")
+
+    def __init__(self, buckets: int):
+        self.successes = 0
+        self.failures: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.counts = [0] * (buckets + 1)
+        self.total_seconds = 0.0
+
+
+class Metrics:
+    """an exporter that keeps counts of outcomes and a histogram of durations for each stage name.
+
+    Add it with add_exporter or tracing, or, at much less cost, add its record method with add_meter or metering,
+    which counts the same without recording spans; use one or the other. Each thread counts into its own shard,
+    without locking; snapshot adds up the shards, so its totals may miss stages that end while it runs.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        if list(buckets) != sorted(set(buckets)):
+            raise ValueError("buckets must be increasing")
+        self.buckets = tuple(float(bound) for bound in buckets)
+        self._local = local()
+        self._shards: list[dict[str, _Counts]] = []
+        self._shards_lock = Lock()
+
+    def _shard(self) -> dict[str, _Counts]:
+        shard: dict[str, _Counts] = {}
+        self._local.shard = shard
+        with self._shards_lock:
+            self._shards.append(shard)
+        return shard
+
+    def _counts(self, name: str) -> _Counts:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        counts = shard.get(name)
+        if counts is None:
+            counts = shard[name] = _Counts(len(self.buckets))
+        return counts
+
+    def __call__(self, span: Span) -> None:
+        counts = self._counts(span.name)
+        if span.outcome is Outcome.SUCCESS:
+            counts.successes += 1
+        else:
+            errors = (
+                counts.failures if span.outcome is Outcome.FAILURE else counts.errors
+            )
+            error = span.error or ""
+            errors[error] = errors.get(error, 0) + 1
+        counts.counts[bisect_left(self.buckets, span.duration)] += 1
+        counts.total_seconds += span.duration
+
+    def record(self, name: str, seconds: float, result: Any) -> None:
+        """count a stage that ran for seconds with result, a Result or the exception it raised; a meter for add_meter."""
+        counts = self._counts(name)
+        if isinstance(result, Success):
+            counts.successes += 1
+        else:
+            if isinstance(result, Failure):
+                errors, error = counts.failures, type(result.value).__name__
+            else:
+                errors, error = counts.errors, type(result).__name__
+            errors[error] = errors.get(error, 0) + 1
+        counts.counts[bisect_left(self.buckets, seconds)] += 1
+        counts.total_seconds += seconds
+
+    def snapshot(self) -> dict[str, StageMetrics]:
+        """return the totals so far for each stage name."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals: dict[str, _Counts] = {}
+        for shard in shards:
+            for name, counts in list(shard.items()):
+                total = totals.get(name)
+                if total is None:
+                    total = totals[name] = _Counts(len(self.buckets))
+                total.successes += counts.successes
+                for error, n in list(counts.failures.items()):
+                    total.failures[error] = total.failures.get(error, 0) + n
+                for error, n in list(counts.errors.items()):
+                    total.errors[error] = total.errors.get(error, 0) + n
+                total.counts = [a + b for a, b in zip(total.counts, counts.counts)]
+                total.total_seconds += counts.total_seconds
+        return {
+            name: StageMetrics(
+                sum(total.counts),
+                total.successes,
+                total.failures,
+                total.errors,
+                self.buckets,
+                tuple(total.counts),
+                total.total_seconds,
+            )
+            for name, total in totals.items()
+        }
+
+    def render(self, prefix: str = "resultpipes") -> str:
+        """return a snapshot in the Prometheus text exposition format."""
+        return render_prometheus(self.snapshot(), prefix)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(
+    metrics: Mapping[str, StageMetrics], prefix: str = "resultpipes"
+) -> str:
+    """return metrics in the Prometheus text exposition format, with a stage label for the name of each."""
+    calls = f"{prefix}_stage_calls_total"
+    outcomes = f"{prefix}_stage_outcomes_total"
+    duration = f"{prefix}_stage_duration_seconds"
+    lines = [
+        f"# HELP {calls} Stage calls.",
+        f"# TYPE {calls} counter",
+    ]
+    for name, stage in metrics.items():
+        lines.append(f'{calls}{{stage="{_label(name)}"}} {stage.calls}')
+    lines += [
+        f"# HELP {outcomes} Stage calls by outcome and error type.",
+        f"# TYPE {outcomes} counter",
+    ]
+    for name, stage in metrics.items():
+        labels = f'stage="{_label(name)}"'
+        if stage.successes:
+            lines.append(
+                f'{outcomes}{{{labels},outcome="success",error=""}} {stage.successes}'
+            )
+        for outcome, errors in (("failure", stage.failures), ("error", stage.errors)):
+            for error, n in errors.items():
+                lines.append(
+                    f'{outcomes}{{{labels},outcome="{outcome}",error="{_label(error)}"}} {n}'
+                )
+    lines += [
+        f"# HELP {duration} Stage call durations.",
+        f"# TYPE {duration} histogram",
+    ]
+    for name, stage in metrics.items():
+        labels = f'stage="{_label(name)}"'
+        cumulative = 0
+        for bound, n in zip(stage.buckets, stage.counts):
+            cumulative += n
+            lines.append(f'{duration}_bucket{{{labels},le="{bound!r}"}} {cumulative}')
+        lines.append(f'{duration}_bucket{{{labels},le="+Inf"}} {stage.calls}')
+        lines.append(f"{duration}_sum{{{labels}}} {stage.total_seconds!r}")
+        lines.append(f"{duration}_count{{{labels}}} {stage.calls}")
+    return "\n".join(lines) + "\n"
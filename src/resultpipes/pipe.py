@@ -1,23 +1,39 @@
 from __future__ import annotations
 
 import asyncio
-from functools import partial, wraps
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import copy_context
+from enum import Enum
+from functools import cached_property, partial, wraps
+from importlib import import_module
+from itertools import groupby
+from operator import attrgetter
+from threading import Lock
+from time import perf_counter
 from typing import (
     Any,
+    AsyncIterable,
+    AsyncIterator,
     Callable,
     Coroutine,
     Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    NamedTuple,
     Never,
     ParamSpec,
+    Sequence,
     TypeAlias,
     TypeGuard,
     TypeVar,
     overload,
 )
-
-from typing_extensions import assert_never  # added to typinhg in python 3.11.
+from weakref import WeakKeyDictionary
 
 from .result import Failure, Result, Success
+from .stream import amap, imap, imap_chunks, staged
+from .trace import _exporters, _hooks, _measure, _Timer
 
 
 def is_async_callable(obj: Any) -> TypeGuard[Any]:
@@ -48,12 +64,443 @@ P_s: TypeAlias = Callable[[X], Result[Y, E]]
 # type P_s[X, Y, E] = Callable[[X], Result[Y, E]]
 
 
+class Route(Enum):
+    """how a stage receives the output of the stage before it."""
+
+    SUCCESS = "|"
+    FAILURE = "&"
+    RESULT = "^"
+
+
+_ACCEPTS: dict[Route, type[Success[Any]] | type[Failure[Any]] | None] = {
+    Route.SUCCESS: Success,
+    Route.FAILURE: Failure,
+    Route.RESULT: None,
+}
+_ROUTES = {accepts: route for route, accepts in _ACCEPTS.items()}
+_REFLECTED = {
+    Route.SUCCESS: "__ror__",
+    Route.FAILURE: "__rand__",
+    Route.RESULT: "__rxor__",
+}
+
+
+def _reflect(route: Route, lhs: Any, rhs: Any) -> Any:
+    # compose lhs with an rhs that is not a Pipeable or APipeable, such as a FlatPipeable, through the
+    # reflected operator of rhs. The operators are aliases of the pipe_* methods, so this is done here
+    # rather than by returning NotImplemented, which the methods must not return.
+    reflected = getattr(type(rhs), _REFLECTED[route], None)
+    result = NotImplemented if reflected is None else reflected(rhs, lhs)
+    if result is NotImplemented:
+        raise TypeError(
+            f"unsupported operand type(s) for {route.value}: "
+            f"'{type(lhs).__name__}' and '{type(rhs).__name__}'"
+        )
+    return result
+
+
+class _Stage(NamedTuple):
+    # accepts is the Result class whose value is passed to func, or None if func is passed the previous
+    # result (or the pipeline input) as is. Like is_async, it is decided once when the pipeline is composed,
+    # so that calls do no dispatch on the kind of a stage.
+    accepts: type[Success[Any]] | type[Failure[Any]] | None
+    func: Callable[[Any], Any]
+    is_async: bool = False
+
+    @property
+    def route(self) -> Route:
+        return _ROUTES[self.accepts]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # A function decorated with pipeable can't be pickled by reference, because its name refers to
+        # the pipeable. In that case, pickle the name and recover the function from the pipeable.
+        module = getattr(self.func, "__module__", None)
+        qualname = getattr(self.func, "__qualname__", "")
+        try:
+            named = _by_name(module, qualname) if module else None
+        except (AttributeError, ImportError):
+            named = None
+        if isinstance(named, (Pipeable, APipeable)) and named.func is self.func:
+            return (_named_stage, (self.accepts, module, qualname, self.is_async))
+        return (_Stage, tuple(self))
+
+
+def _by_name(module: str, qualname: str) -> Any:
+    obj: Any = import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _named_stage(
+    accepts: type[Success[Any]] | type[Failure[Any]] | None,
+    module: str,
+    qualname: str,
+    is_async: bool,
+) -> _Stage:
+    return _Stage(accepts, _by_name(module, qualname).func, is_async)
+
+
+# The first stage of a pipeline always has route RESULT (accepts None); it is passed the pipeline input as is.
+_Stages: TypeAlias = tuple[_Stage, ...]
+
+
+def _join(
+    lhs: _Stages, route: Route, rhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]
+) -> _Stages:
+    # lhs followed by rhs, routed by route. The stages of rhs can be spliced into lhs when doing so
+    # doesn't change what runs: always for ^, and for | or & when every later stage of rhs uses the same route.
+    # Otherwise rhs is kept as a single stage.
+    stages = rhs._stages
+    accepts = _ACCEPTS[route]
+    if accepts is None or all(stage.accepts is accepts for stage in stages[1:]):
+        return lhs + (stages[0]._replace(accepts=accepts),) + stages[1:]
+    return lhs + (_Stage(accepts, rhs, isinstance(rhs, APipeable)),)
+
+
+def _fuse(stages: _Stages) -> _Stages:
+    # Replace each run of two or more consecutive sync stages with a single sync stage that runs them
+    # in a plain loop, so that an APipeable only awaits at the stages that are actually async.
+    plan: list[_Stage] = []
+    for is_async, group in groupby(stages, key=attrgetter("is_async")):
+        run = tuple(group)
+        if is_async or len(run) == 1:
+            plan.extend(run)
+        else:
+            plan.append(_Stage(None, Pipeable._from_stages(run)))
+    return tuple(plan)
+
+
+# The functions made by success and failure, with the Result class each always returns and the function it wraps.
+# They are kept here rather than marked with an attribute, which functools.wraps would copy to other wrappers.
+_wrappers: WeakKeyDictionary[
+    Callable[..., Any],
+    tuple[type[Success[Any]] | type[Failure[Any]], Callable[..., Any]],
+] = WeakKeyDictionary()
+
+
+def _always(func: Any) -> type[Success[Any]] | type[Failure[Any]] | None:
+    # the Result class that func always returns, if known: that of a function made by success or failure.
+    if isinstance(func, _Composed):
+        return func._always
+    try:
+        entry = _wrappers.get(func)
+    except TypeError:
+        # func can't be weakly referenced or hashed, so is not one of them.
+        return None
+    return None if entry is None else entry[0]
+
+
+_OTHER = {Success: Failure, Failure: Success}
+
+
+def _prune(stages: _Stages) -> _Stages:
+    # Remove the stages that can never run, because the result passed to them is known to be of the class
+    # they don't accept: for example, & handlers after a stage built with success().
+    kept: list[_Stage] = []
+    known: type[Success[Any]] | type[Failure[Any]] | None = None
+    for stage in stages:
+        always = _always(stage.func)
+        if stage.accepts is None or stage.accepts is known:
+            known = always
+        elif known is not None:
+            continue
+        else:
+            # the stage may or may not run; if not, the result is of the class it doesn't accept.
+            known = always if always is _OTHER[stage.accepts] else None
+        kept.append(stage)
+    return tuple(kept)
+
+
+class _Composed:
+    # A run of sync success and failure wrappers, each accepting the class the one before always returns,
+    # called as one stage: the functions they wrap are applied in turn, and only the last value is wrapped.
+    def __init__(self, stages: _Stages):
+        self.stages = stages
+        self._funcs = tuple(_wrappers[stage.func][1] for stage in stages)
+        self._always = _wrappers[stages[-1].func][0]
+
+    def __call__(self, x: Any) -> Any:
+        for func in self._funcs:
+            x = func(x)
+        return self._always(x)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_Composed, (self.stages,))
+
+
+def _run(stage: _Stage) -> _Stages:
+    # the success and failure wrappers that stage calls in turn, the first routed as stage is.
+    if not isinstance(stage.func, _Composed):
+        return (stage,)
+    first, *rest = stage.func.stages
+    return (first._replace(accepts=stage.accepts), *rest)
+
+
+def _merge(stages: _Stages) -> _Stages:
+    # A stage is merged into the one before only if it runs exactly when that one does: it accepts what the
+    # one before always returns, and whatever the one before doesn't run on, it doesn't either.
+    merged: list[_Stage] = []
+    for stage in stages:
+        if merged and stage.accepts is not None and not stage.is_async:
+            last = merged[-1]
+            if (
+                not last.is_async
+                and last.accepts in (None, stage.accepts)
+                and _always(stage.func) is not None
+                and _always(last.func) is stage.accepts
+            ):
+                merged[-1] = _Stage(last.accepts, _Composed(_run(last) + _run(stage)))
+                continue
+        merged.append(stage)
+    return tuple(merged)
+
+
+def _optimize(stages: _Stages) -> _Stages:
+    # Optimize nested pipelines, splicing those left with a single stage, remove stages that can never run,
+    # then merge runs of success and failure wrappers.
+    joined: _Stages = ()
+    for stage in stages:
+        if isinstance(stage.func, (Pipeable, APipeable)):
+            joined = _join(joined, stage.route, stage.func.optimize())
+        else:
+            joined += (stage,)
+    return _merge(_prune(joined))
+
+
+def _explain(stages: _Stages, indent: str = "") -> list[str]:
+    lines = []
+    for stage in stages:
+        func = stage.func
+        if isinstance(func, (Pipeable, APipeable)) and len(func._stages) > 1:
+            kind = "async" if stage.is_async else "sync"
+            lines.append(f"{indent}{stage.route.value} pipeline ({kind})")
+            lines.extend(_explain(func._stages, indent + "    "))
+            continue
+        if isinstance(func, _Offload):
+            kind = "thread"
+        else:
+            kind = "async" if stage.is_async else "sync"
+        always = _always(func)
+        if always is not None:
+            kind += f", always {always.__name__}"
+        lines.append(f"{indent}{stage.route.value} {_describe(func)} ({kind})")
+    return lines
+
+
+def _describe(func: Any) -> str:
+    # the name of a stage in spans: a function's qualified name, or the composition of a pipeline's stages.
+    if isinstance(func, (Pipeable, APipeable)):
+        return func._name
+    if isinstance(func, _Offload):
+        return _describe(func.func)
+    if isinstance(func, _Composed):
+        return _describe_stages(func.stages)
+    return getattr(func, "__qualname__", None) or type(func).__qualname__
+
+
+def _describe_stages(stages: _Stages) -> str:
+    names = []
+    for index, (_, func, _) in enumerate(stages):
+        name = _describe(func)
+        if isinstance(func, (Pipeable, APipeable)) and len(func._stages) > 1:
+            name = f"({name})"
+        names.append(name if index == 0 else f"{stages[index].route.value} {name}")
+    return " ".join(names)
+
+
+def _call_traced(pipe: Pipeable[Any, Any, Any], x: Any) -> Any:
+    # Pipeable.__call__, recording a span for each stage that runs, within a span for the whole pipeline.
+    # A stage that is itself a pipeline records its own spans.
+    pipeline = _Timer(pipe._name) if len(pipe._stages) > 1 else None
+    result: Any = x
+    try:
+        for accepts, func, _ in pipe._stages:
+            if accepts is None:
+                arg = result
+            elif isinstance(result, accepts):
+                arg = result.value
+            else:
+                continue
+            if isinstance(func, Pipeable):
+                result = func(arg)
+                continue
+            stage = _Timer(_describe(func))
+            try:
+                result = func(arg)
+            except BaseException as exc:
+                stage.end(exc)
+                raise
+            stage.end(result)
+    except BaseException as exc:
+        if pipeline is not None:
+            pipeline.end(exc)
+        raise
+    if pipeline is not None:
+        pipeline.end(result)
+    return result
+
+
+async def _acall_traced(pipe: APipeable[Any, Any, Any], x: Any) -> Any:
+    # APipeable.__call__, traced like _call_traced. The stages are run unfused, so that each has its span.
+    pipeline = _Timer(pipe._name) if len(pipe._stages) > 1 else None
+    result: Any = x
+    try:
+        for accepts, func, is_async in pipe._stages:
+            if accepts is None:
+                arg = result
+            elif isinstance(result, accepts):
+                arg = result.value
+            else:
+                continue
+            if isinstance(func, (Pipeable, APipeable, _Offload)):
+                result = func(arg)
+                if is_async:
+                    result = await result
+                continue
+            stage = _Timer(_describe(func))
+            try:
+                result = func(arg)
+                if is_async:
+                    result = await result
+            except BaseException as exc:
+                stage.end(exc)
+                raise
+            stage.end(result)
+    except BaseException as exc:
+        if pipeline is not None:
+            pipeline.end(exc)
+        raise
+    if pipeline is not None:
+        pipeline.end(result)
+    return result
+
+
+def _call_metered(pipe: Pipeable[Any, Any, Any], x: Any) -> Any:
+    # Pipeable.__call__, passing the duration of each stage that runs, and of the whole pipeline, to the meters.
+    # Unlike _call_traced, it allocates no span or context, and reads the clock once per stage, timing each from
+    # the end of the one before, so that metrics are cheap enough to leave on.
+    stages = pipe._stages
+    names = pipe._stage_names
+    result: Any = x
+    started = last = perf_counter()
+    try:
+        for index in range(len(stages)):
+            accepts, func, _ = stages[index]
+            if accepts is None:
+                arg = result
+            elif isinstance(result, accepts):
+                arg = result.value
+            else:
+                continue
+            if isinstance(func, Pipeable):
+                # a nested pipeline meters its own stages.
+                result = func(arg)
+                last = perf_counter()
+                continue
+            try:
+                result = func(arg)
+            except BaseException as exc:
+                _measure(names[index], perf_counter() - last, exc)
+                raise
+            now = perf_counter()
+            _measure(names[index], now - last, result)
+            last = now
+    except BaseException as exc:
+        if len(stages) > 1:
+            _measure(pipe._name, perf_counter() - started, exc)
+        raise
+    if len(stages) > 1:
+        _measure(pipe._name, last - started, result)
+    return result
+
+
+async def _acall_metered(pipe: APipeable[Any, Any, Any], x: Any) -> Any:
+    # APipeable.__call__, metered like _call_metered.
+    stages = pipe._stages
+    names = pipe._stage_names
+    result: Any = x
+    started = last = perf_counter()
+    try:
+        for index in range(len(stages)):
+            accepts, func, is_async = stages[index]
+            if accepts is None:
+                arg = result
+            elif isinstance(result, accepts):
+                arg = result.value
+            else:
+                continue
+            if isinstance(func, (Pipeable, APipeable, _Offload)):
+                result = func(arg)
+                if is_async:
+                    result = await result
+                last = perf_counter()
+                continue
+            try:
+                result = func(arg)
+                if is_async:
+                    result = await result
+            except BaseException as exc:
+                _measure(names[index], perf_counter() - last, exc)
+                raise
+            now = perf_counter()
+            _measure(names[index], now - last, result)
+            last = now
+    except BaseException as exc:
+        if len(stages) > 1:
+            _measure(pipe._name, perf_counter() - started, exc)
+        raise
+    if len(stages) > 1:
+        _measure(pipe._name, last - started, result)
+    return result
+
+
 class Pipeable(Generic[X, Y, E]):
+    _stages: _Stages
+
     def __init__(self, func: P_s[X, Y, E]):
-        self.func = func
+        self._stages = (_Stage(None, func),)
+
+    @classmethod
+    def _from_stages(cls, stages: _Stages) -> Pipeable[Any, Any, Any]:
+        pipe = cls.__new__(cls)
+        pipe._stages = stages
+        return pipe
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self._from_stages, (self._stages,))
+
+    @property
+    def func(self) -> P_s[X, Y, E]:
+        return self._stages[0].func if len(self._stages) == 1 else self
+
+    @cached_property
+    def _name(self) -> str:
+        return _describe_stages(self._stages)
+
+    @cached_property
+    def _stage_names(self) -> tuple[str, ...]:
+        return tuple(_describe(stage.func) for stage in self._stages)
 
     def __call__(self, x: X) -> Result[Y, E]:
-        return self.func(x)
+        # Stages run in a single loop, so stack depth does not grow with the length of the pipeline.
+        if _hooks:
+            return _call_traced(self, x) if _exporters else _call_metered(self, x)
+        result: Any = x
+        for accepts, func, _ in self._stages:
+            if accepts is None:
+                result = func(result)
+            elif isinstance(result, accepts):
+                result = func(result.value)
+        return result
+
+    def _pipe(
+        self, route: Route, rhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]
+    ) -> Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]:
+        if not isinstance(rhs, (Pipeable, APipeable)):
+            return _reflect(route, self, rhs)
+        cls = APipeable if isinstance(rhs, APipeable) else Pipeable
+        return cls._from_stages(_join(self._stages, route, rhs))
 
     @overload
     def pipe_success(self, rhs: Pipeable[Y, Z, E1]) -> Pipeable[X, Z, E | E1]:
@@ -66,31 +513,7 @@ class Pipeable(Generic[X, Y, E]):
     def pipe_success(
         self, rhs: Pipeable[Y, Z, E1] | APipeable[Y, Z, E1]
     ) -> Pipeable[X, Z, E | E1] | APipeable[X, Z, E | E1]:
-        match rhs:
-            case APipeable():
-
-                async def ainvoke(x: X) -> Result[Z, E | E1]:
-                    result = self(x)
-                    match result:
-                        case Success():
-                            return await rhs(result.value)
-                        case Failure():
-                            return result
-
-                return APipeable(ainvoke)
-            case Pipeable():
-
-                def invoke(x: X) -> Result[Z, E | E1]:
-                    result = self(x)
-                    match result:
-                        case Success():
-                            return rhs(result.value)
-                        case Failure():
-                            return result
-
-                return Pipeable(invoke)
-            case _ as oops:  # pragma: no cover # type: ignore
-                assert_never(oops)
+        return self._pipe(Route.SUCCESS, rhs)
 
     __or__ = pipe_success
 
@@ -105,31 +528,7 @@ class Pipeable(Generic[X, Y, E]):
     def pipe_failure(
         self, rhs: Pipeable[E, Y1, E1] | APipeable[E, Y1, E1]
     ) -> Pipeable[X, Y | Y1, E1] | APipeable[X, Y | Y1, E1]:
-        match rhs:
-            case APipeable():
-
-                async def ainvoke(x: X) -> Result[Y | Y1, E1]:
-                    result = self(x)
-                    match result:
-                        case Success():
-                            return result
-                        case Failure():
-                            return await rhs(result.value)
-
-                return APipeable(ainvoke)
-            case Pipeable():
-
-                def invoke(x: X) -> Result[Y | Y1, E1]:
-                    result = self(x)
-                    match result:
-                        case Success():
-                            return result
-                        case Failure():
-                            return rhs(result.value)
-
-                return Pipeable(invoke)
-            case _ as oops:  # pragma: no cover # type: ignore
-                assert_never(oops)
+        return self._pipe(Route.FAILURE, rhs)
 
     __and__ = pipe_failure
 
@@ -146,23 +545,74 @@ class Pipeable(Generic[X, Y, E]):
     def pipe_result(
         self, rhs: Pipeable[Result[Y, E], Z, E1] | APipeable[Result[Y, E], Z, E1]
     ) -> Pipeable[X, Z, E | E1] | APipeable[X, Z, E | E1]:
-        match rhs:
-            case APipeable():
+        return self._pipe(Route.RESULT, rhs)
 
-                async def ainvoke(x: X) -> Result[Z, E | E1]:
-                    return await rhs(self(x))
+    __xor__ = pipe_result
 
-                return APipeable(ainvoke)
-            case Pipeable():
+    def amap(
+        self,
+        inputs: Iterable[X] | AsyncIterable[X],
+        concurrency: int = 16,
+        ordered: bool = True,
+        executor: Executor | None = None,
+    ) -> AsyncIterator[Result[Y, E]]:
+        """apply self to each of inputs in threads from executor (default: the event loop's); see stream.amap."""
 
-                def invoke(x: X) -> Result[Z, E | E1]:
-                    return rhs(self(x))
+        def run(x: X) -> asyncio.Future[Result[Y, E]]:
+            return asyncio.get_running_loop().run_in_executor(executor, self, x)
 
-                return Pipeable(invoke)
-            case _ as oops:  # pragma: no cover # type: ignore
-                assert_never(oops)
+        return amap(run, inputs, concurrency, ordered)
 
-    __xor__ = pipe_result
+    def imap(
+        self, inputs: Iterable[X], stop_on_failure: bool = False
+    ) -> Iterator[Result[Y, E]]:
+        """apply self to each of inputs lazily; see stream.imap."""
+        return imap(self, inputs, stop_on_failure)
+
+    def imap_chunks(
+        self, inputs: Iterable[X], size: int = 1024, stop_on_failure: bool = False
+    ) -> Iterator[list[Result[Y, E]]]:
+        """apply self to inputs size at a time, yielding lists of results; see stream.imap_chunks."""
+        return imap_chunks(self, inputs, size, stop_on_failure)
+
+    def explain(self) -> str:
+        """return a description of the stages of self, one per line, with how each is routed and whether it is async."""
+        return "\n".join(_explain(self._stages))
+
+    def optimize(self) -> Pipeable[X, Y, E]:
+        """return an equivalent Pipeable without stages that can never run, and with runs of stages made with
+        success or failure merged into one."""
+        return Pipeable._from_stages(_optimize(self._stages))
+
+    def offload(self, executor: Executor | None = None) -> APipeable[X, Y, E]:
+        """return an APipeable that calls self in a thread from executor, by default the shared offload_executor()."""
+        return APipeable(_Offload(self, executor))
+
+
+_offload_executor: ThreadPoolExecutor | None = None
+_offload_executor_lock = Lock()
+
+
+def offload_executor() -> ThreadPoolExecutor:
+    """the thread pool shared by offloaded stages that are not given an executor."""
+    global _offload_executor
+    with _offload_executor_lock:
+        if _offload_executor is None:
+            _offload_executor = ThreadPoolExecutor(thread_name_prefix="resultpipes")
+        return _offload_executor
+
+
+class _Offload:
+    def __init__(self, func: Callable[[Any], Any], executor: Executor | None):
+        self.func = func
+        self.executor = executor
+
+    async def __call__(self, x: Any) -> Any:
+        # like asyncio.to_thread, run func in a copy of the current context, so that context variables are seen by func.
+        context = copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor or offload_executor(), context.run, self.func, x
+        )
 
 
 P_a: TypeAlias = Callable[[X], Coroutine[Any, Any, Result[Y, E]]]
@@ -170,11 +620,60 @@ P_a: TypeAlias = Callable[[X], Coroutine[Any, Any, Result[Y, E]]]
 
 
 class APipeable(Generic[X, Y, E]):
+    _stages: _Stages
+
     def __init__(self, func: P_a[X, Y, E]):
-        self.func = func
+        self._stages = (_Stage(None, func, True),)
+
+    @classmethod
+    def _from_stages(cls, stages: _Stages) -> APipeable[Any, Any, Any]:
+        pipe = cls.__new__(cls)
+        pipe._stages = stages
+        return pipe
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self._from_stages, (self._stages,))
+
+    @cached_property
+    def _plan(self) -> _Stages:
+        # built on first call rather than on each composition, as most intermediate pipelines are never called.
+        return _fuse(self._stages)
+
+    @property
+    def func(self) -> P_a[X, Y, E]:
+        return self._stages[0].func if len(self._stages) == 1 else self
+
+    @cached_property
+    def _name(self) -> str:
+        return _describe_stages(self._stages)
+
+    @cached_property
+    def _stage_names(self) -> tuple[str, ...]:
+        return tuple(_describe(stage.func) for stage in self._stages)
 
     async def __call__(self, x: X) -> Result[Y, E]:
-        return await self.func(x)
+        if _hooks:
+            if _exporters:
+                return await _acall_traced(self, x)
+            return await _acall_metered(self, x)
+        result: Any = x
+        for accepts, func, is_async in self._plan:
+            if accepts is None:
+                result = func(result)
+            elif isinstance(result, accepts):
+                result = func(result.value)
+            else:
+                continue
+            if is_async:
+                result = await result
+        return result
+
+    def _pipe(
+        self, route: Route, rhs: Pipeable[Any, Any, Any] | APipeable[Any, Any, Any]
+    ) -> APipeable[Any, Any, Any]:
+        if not isinstance(rhs, (Pipeable, APipeable)):
+            return _reflect(route, self, rhs)
+        return APipeable._from_stages(_join(self._stages, route, rhs))
 
     @overload
     def __or__(self, rhs: Pipeable[Y, Z, E1]) -> APipeable[X, Z, E | E1]:
@@ -187,21 +686,7 @@ class APipeable(Generic[X, Y, E]):
     def __or__(
         self, rhs: Pipeable[Y, Z, E1] | APipeable[Y, Z, E1]
     ) -> APipeable[X, Z, E | E1]:
-        async def ainvoke(x: X) -> Result[Z, E | E1]:
-            result = await self(x)
-            match result:
-                case Success(value):
-                    match rhs:
-                        case APipeable():
-                            return await rhs(value)
-                        case Pipeable():
-                            return rhs(value)
-                case Failure():
-                    return result
-                case _ as oops:  # pragma: no cover # type: ignore
-                    assert_never(oops)
-
-        return APipeable(ainvoke)
+        return self._pipe(Route.SUCCESS, rhs)
 
     @overload
     def pipe_failure(self, rhs: Pipeable[E, Y1, E1]) -> APipeable[X, Y | Y1, E1]:
@@ -214,21 +699,7 @@ class APipeable(Generic[X, Y, E]):
     def pipe_failure(
         self, rhs: Pipeable[E, Y1, E1] | APipeable[E, Y1, E1]
     ) -> APipeable[X, Y | Y1, E1]:
-        async def ainvoke(x: X) -> Result[Y, E1]:
-            result = await self(x)
-            match result:
-                case Success():
-                    return result
-                case Failure(error):
-                    if is_async_callable(rhs):
-                        return await rhs(error)
-                    else:
-                        assert is_not_async_callable(rhs)
-                        return rhs(error)
-                case _ as oops:  # pragma: no cover # type: ignore
-                    assert_never(oops)
-
-        return APipeable(ainvoke)
+        return self._pipe(Route.FAILURE, rhs)
 
     __and__ = pipe_failure
 
@@ -243,40 +714,93 @@ class APipeable(Generic[X, Y, E]):
     def pipe_result(
         self, rhs: Pipeable[Result[Y, E], Z, E1] | APipeable[Result[Y, E], Z, E1]
     ) -> APipeable[X, Z, E1]:
-        match rhs:
-            case APipeable():
+        return self._pipe(Route.RESULT, rhs)
+
+    __xor__ = pipe_result
 
-                async def ainvoke(x: X) -> Result[Z, E1]:
-                    return await rhs(await self(x))
+    def amap(
+        self,
+        inputs: Iterable[X] | AsyncIterable[X],
+        concurrency: int = 16,
+        ordered: bool = True,
+    ) -> AsyncIterator[Result[Y, E]]:
+        """apply self to each of inputs, with at most concurrency calls in flight; see stream.amap."""
+        return amap(self, inputs, concurrency, ordered)
+
+    def explain(self) -> str:
+        """return a description of the stages of self, one per line, with how each is routed and whether it is async."""
+        return "\n".join(_explain(self._stages))
+
+    def optimize(self) -> APipeable[X, Y, E]:
+        """return an equivalent APipeable without stages that can never run, and with runs of sync stages made with
+        success or failure merged into one."""
+        return APipeable._from_stages(_optimize(self._stages))
+
+    def stream(
+        self,
+        inputs: Iterable[X] | AsyncIterable[X],
+        concurrency: int | Sequence[int] = 1,
+        buffer: int = 1,
+        ordered: bool = True,
+    ) -> AsyncIterator[Result[Y, E]]:
+        """apply self to each of inputs, with each stage running as its own group of workers; see stream.staged.
+
+        While one stage works on an item, earlier stages work on later items. concurrency may give a limit
+        for each stage as composed.
+        """
+        return staged(self._stages, inputs, concurrency, buffer, ordered)
 
-                return APipeable(ainvoke)
-            case Pipeable():
 
-                async def invoke(x: X) -> Result[Z, E1]:
-                    return rhs(await self(x))
+@overload
+def pipeable(f: P_s[X, Y, E]) -> Pipeable[X, Y, E]:
+    ...  # pragma: no cover
 
-                return APipeable(invoke)
-            case _ as oops:  # pragma: no cover # type: ignore
-                assert_never(oops)
 
-    __xor__ = pipe_result
+@overload
+def pipeable(f: P_a[X, Y, E]) -> APipeable[X, Y, E]:
+    ...  # pragma: no cover
 
 
 @overload
-def pipeable(f: P_s[X, Y, E]) -> Pipeable[X, Y, E]:
+def pipeable(
+    f: P_s[X, Y, E], offload: Literal["thread"], executor: Executor | None = None
+) -> APipeable[X, Y, E]:
     ...  # pragma: no cover
 
 
 @overload
-def pipeable(f: P_a[X, Y, E]) -> APipeable[X, Y, E]:
+def pipeable(
+    *, offload: Literal["thread"], executor: Executor | None = None
+) -> Callable[[P_s[X, Y, E]], APipeable[X, Y, E]]:
     ...  # pragma: no cover
 
 
-def pipeable(f: P_s[X, Y, E] | P_a[X, Y, E]) -> Pipeable[X, Y, E] | APipeable[X, Y, E]:
+def pipeable(
+    f: P_s[X, Y, E] | P_a[X, Y, E] | None = None,
+    offload: Literal["thread"] | None = None,
+    executor: Executor | None = None,
+) -> (
+    Pipeable[X, Y, E]
+    | APipeable[X, Y, E]
+    | Callable[[P_s[X, Y, E]], APipeable[X, Y, E]]
+):
+    """return a Pipeable, or an APipeable if f is async.
+
+    With offload="thread", a sync f is called in a thread from executor (by default, offload_executor()),
+    and an APipeable is returned. Without f, return a decorator.
+    """
+    if f is None:
+        return partial(pipeable, offload=offload, executor=executor)  # type: ignore
     if is_async_callable(f):
+        if offload is not None:
+            raise ValueError("only a sync callable can be offloaded")
         return APipeable(f)
     else:
         assert is_not_async_callable(f)
+        if offload == "thread":
+            return Pipeable(f).offload(executor)
+        elif offload is not None:
+            raise ValueError(f"unknown offload {offload!r}")
         return Pipeable(f)
 
 
@@ -298,10 +822,12 @@ def success(
     """decorator that transforms a function f with return type T to a function that returns Result[T, Never]."""
     if is_async_callable(f):
 
+        @wraps(f)
         async def _a(*args: P.args, **kwargs: P.kwargs) -> Result[R, Never]:
             x = await f(*args, **kwargs)
             return Success(x)
 
+        _wrappers[_a] = (Success, f)
         return _a
     else:
         assert is_not_async_callable(f)
@@ -312,6 +838,7 @@ def success(
             x = f(*args, **kwargs)
             return Success(x)
 
+        _wrappers[_f] = (Success, f)
         return _f
 
 
@@ -333,10 +860,12 @@ def failure(
     """decorator that transforms a function f with return type T to a function that returns Result[T, Never]."""
     if is_async_callable(f):
 
+        @wraps(f)
         async def _a(*args: P.args, **kwargs: P.kwargs) -> Result[Never, R]:
             x = await f(*args, **kwargs)
             return Failure(x)
 
+        _wrappers[_a] = (Failure, f)
         return _a
     else:
         assert is_not_async_callable(f)
@@ -347,4 +876,5 @@ def failure(
             x = f(*args, **kwargs)
             return Failure(x)
 
+        _wrappers[_f] = (Failure, f)
         return _f
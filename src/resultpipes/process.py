@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import pickle
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from itertools import islice
+from typing import Any, Iterable, Iterator, TypeVar
+
+from .pipe import Pipeable
+from .result import Result
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+# pipelines unpickled in a worker process, so that a pipeline is unpickled once per process rather than per chunk.
+_pipes: dict[bytes, Pipeable[Any, Any, Any]] = {}
+_MAX_PIPES = 8
+
+
+def _run_chunk(payload: bytes, chunk: list[Any]) -> list[Result[Any, Any]]:
+    pipe = _pipes.get(payload)
+    if pipe is None:
+        if len(_pipes) >= _MAX_PIPES:
+            _pipes.clear()
+        pipe = _pipes[payload] = pickle.loads(payload)
+    return [pipe(x) for x in chunk]
+
+
+def process_map(
+    pipe: Pipeable[X, Y, E],
+    inputs: Iterable[X],
+    chunksize: int = 64,
+    ordered: bool = True,
+    executor: Executor | None = None,
+    window: int | None = None,
+) -> Iterator[Result[Y, E]]:
+    """apply pipe to each of inputs in worker processes, yielding the results.
+
+    Inputs are sent to workers in chunks of chunksize, and at most window chunks (by default, twice
+    the number of CPUs) are in flight at a time. If ordered is False, results are yielded as chunks
+    complete. If executor is None, a ProcessPoolExecutor is created, and shut down when iteration stops.
+    pipe, inputs and results must be picklable; the functions in pipe must be importable by name.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if window is None:
+        window = 2 * (os.cpu_count() or 1)
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    return _process_map(pipe, iter(inputs), chunksize, ordered, executor, window)
+
+
+def _process_map(
+    pipe: Pipeable[X, Y, E],
+    items: Iterator[X],
+    chunksize: int,
+    ordered: bool,
+    executor: Executor | None,
+    window: int,
+) -> Iterator[Result[Y, E]]:
+    payload = pickle.dumps(pipe)
+    pool = ProcessPoolExecutor() if executor is None else executor
+    pending: deque[Future[list[Result[Y, E]]]] = deque()
+    try:
+        while True:
+            while len(pending) < window and (chunk := list(islice(items, chunksize))):
+                pending.append(pool.submit(_run_chunk, payload, chunk))
+            if not pending:
+                return
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                for future in done:
+                    yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown(wait=False, cancel_futures=True)
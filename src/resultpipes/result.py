@@ -36,6 +36,9 @@ class _Result(Generic[R]):
     def __hash__(self):
         return hash(self._value)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self.__class__, (self._value,))
+
     @property
     def value(self) -> R:
         return self._value
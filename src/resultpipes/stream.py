@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    TypeAlias,
+    TypeVar,
+)
+
+from .result import Failure, Result, Success
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+R = TypeVar("R")
+
+
+async def _from_iterable(items: Iterable[X]) -> AsyncGenerator[X, None]:
+    for item in items:
+        yield item
+
+
+def as_async_iterator(items: Iterable[X] | AsyncIterable[X]) -> AsyncIterator[X]:
+    """return an async iterator over items, which may be a sync or an async iterable."""
+    if isinstance(items, AsyncIterable):
+        return aiter(items)
+    return _from_iterable(items)
+
+
+def amap(
+    func: Callable[[X], Awaitable[R]],
+    inputs: Iterable[X] | AsyncIterable[X],
+    concurrency: int = 16,
+    ordered: bool = True,
+) -> AsyncIterator[R]:
+    """apply func to each of inputs, with at most concurrency calls in flight, yielding the results.
+
+    Inputs are pulled only when a call can be started, and no more than concurrency results are held
+    at a time, so memory use does not depend on the number of inputs. If ordered is False, results are
+    yielded as they complete.  Calls still in flight when iteration stops are cancelled.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    return _amap(func, as_async_iterator(inputs), concurrency, ordered)
+
+
+async def _amap(
+    func: Callable[[X], Awaitable[R]],
+    items: AsyncIterator[X],
+    concurrency: int,
+    ordered: bool,
+) -> AsyncGenerator[R, None]:
+    pending: deque[asyncio.Future[R]] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    x = await anext(items)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.append(asyncio.ensure_future(func(x)))
+            if not pending:
+                return
+            if ordered:
+                yield await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.remove(future)
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+_DONE: Any = object()
+
+
+class _Raised(NamedTuple):
+    exc: Exception
+
+
+Step: TypeAlias = tuple[Any, Callable[[Any], Any], bool]
+
+
+def staged(
+    steps: Sequence[Step],
+    inputs: Iterable[Any] | AsyncIterable[Any],
+    concurrency: int | Sequence[int] = 1,
+    buffer: int = 1,
+    ordered: bool = True,
+) -> AsyncIterator[Any]:
+    """run each of steps as its own group of workers, passing items between them through queues.
+
+    A step is a tuple (accepts, func, is_async); func is passed the value of a result that is an
+    instance of accepts, or the result itself if accepts is None, and other results are passed on
+    unchanged. concurrency is the number of workers for each step, or a sequence giving one per step.
+    Each queue holds at most buffer items, and the number of items in the pipeline at once is bounded.
+    """
+    limits = (
+        [concurrency] * len(steps)
+        if isinstance(concurrency, int)
+        else list(concurrency)
+    )
+    if len(limits) != len(steps):
+        raise ValueError("concurrency must give one limit per stage")
+    if min(limits, default=1) < 1 or buffer < 1:
+        raise ValueError("concurrency and buffer must be at least 1")
+    return _staged(steps, as_async_iterator(inputs), limits, buffer, ordered)
+
+
+async def _staged(
+    steps: Sequence[Step],
+    items: AsyncIterator[Any],
+    limits: list[int],
+    buffer: int,
+    ordered: bool,
+) -> AsyncIterator[Any]:
+    # sink is unbounded, but window bounds the items admitted and not yet yielded.
+    queues: list[asyncio.Queue[Any]] = [asyncio.Queue(buffer) for _ in steps]
+    sink: asyncio.Queue[Any] = asyncio.Queue()
+    queues.append(sink)
+    window = asyncio.Semaphore(sum(limits) + buffer * len(steps))
+    tasks = [
+        asyncio.ensure_future(
+            _feed(items, queues[0], limits[0] if limits else 1, window, sink)
+        )
+    ]
+    for step, limit, inbox, outbox, next_limit in zip(
+        steps, limits, queues, queues[1:], limits[1:] + [1]
+    ):
+        tasks.append(
+            asyncio.ensure_future(_stage(step, limit, inbox, outbox, next_limit, sink))
+        )
+
+    waiting: dict[int, Any] = {}
+    next_index = 0
+    try:
+        while (item := await sink.get()) is not _DONE:
+            if isinstance(item, _Raised):
+                raise item.exc
+            index, result = item
+            if not ordered:
+                window.release()
+                yield result
+                continue
+            waiting[index] = result
+            while next_index in waiting:
+                window.release()
+                yield waiting.pop(next_index)
+                next_index += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _feed(
+    items: AsyncIterator[Any],
+    outbox: asyncio.Queue[Any],
+    limit: int,
+    window: asyncio.Semaphore,
+    sink: asyncio.Queue[Any],
+) -> None:
+    try:
+        index = 0
+        while True:
+            await window.acquire()
+            try:
+                x = await anext(items)
+            except StopAsyncIteration:
+                break
+            await outbox.put((index, x))
+            index += 1
+        for _ in range(limit):
+            await outbox.put(_DONE)
+    except Exception as exc:
+        sink.put_nowait(_Raised(exc))
+
+
+async def _stage(
+    step: Step,
+    limit: int,
+    inbox: asyncio.Queue[Any],
+    outbox: asyncio.Queue[Any],
+    next_limit: int,
+    sink: asyncio.Queue[Any],
+) -> None:
+    workers = [
+        asyncio.ensure_future(_work(step, inbox, outbox, sink)) for _ in range(limit)
+    ]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+    for _ in range(next_limit):
+        await outbox.put(_DONE)
+
+
+async def _work(
+    step: Step,
+    inbox: asyncio.Queue[Any],
+    outbox: asyncio.Queue[Any],
+    sink: asyncio.Queue[Any],
+) -> None:
+    accepts, func, is_async = step
+    try:
+        while (item := await inbox.get()) is not _DONE:
+            index, result = item
+            if accepts is None or isinstance(result, accepts):
+                result = func(result if accepts is None else result.value)
+                if is_async:
+                    result = await result
+            await outbox.put((index, result))
+    except Exception as exc:
+        sink.put_nowait(_Raised(exc))
+
+
+def imap(
+    func: Callable[[X], Result[Y, E]],
+    inputs: Iterable[X],
+    stop_on_failure: bool = False,
+) -> Iterator[Result[Y, E]]:
+    """apply func to each of inputs lazily, yielding the results; with stop_on_failure, stop after the first Failure."""
+    if not stop_on_failure:
+        yield from map(func, inputs)
+        return
+    for x in inputs:
+        result = func(x)
+        yield result
+        if isinstance(result, Failure):
+            return
+
+
+def imap_chunks(
+    func: Callable[[X], Result[Y, E]],
+    inputs: Iterable[X],
+    size: int = 1024,
+    stop_on_failure: bool = False,
+) -> Iterator[list[Result[Y, E]]]:
+    """apply func to inputs size at a time, yielding a list of the results of each chunk.
+
+    This avoids resuming a generator for every input. With stop_on_failure, the last list ends with the
+    first Failure.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    return _imap_chunks(func, iter(inputs), size, stop_on_failure)
+
+
+def _imap_chunks(
+    func: Callable[[X], Result[Y, E]],
+    items: Iterator[X],
+    size: int,
+    stop_on_failure: bool,
+) -> Iterator[list[Result[Y, E]]]:
+    while chunk := list(islice(items, size)):
+        if not stop_on_failure:
+            yield list(map(func, chunk))
+            continue
+        results = []
+        for x in chunk:
+            result = func(x)
+            results.append(result)
+            if isinstance(result, Failure):
+                yield results
+                return
+        yield results
+
+
+def partition(
+    results: Iterable[Result[Y, E]],
+    on_success: Callable[[Y], Any],
+    on_failure: Callable[[E], Any],
+) -> tuple[int, int]:
+    """pass the value of each of results to on_success or on_failure as it arrives, and return the counts of each."""
+    successes = failures = 0
+    for result in results:
+        if isinstance(result, Success):
+            on_success(result.value)
+            successes += 1
+        else:
+            on_failure(result.value)
+            failures += 1
+    return successes, failures
+
+
+def successes(results: Iterable[Result[Y, E]]) -> Iterator[Y]:
+    """yield the values of the successes among results."""
+    return (result.value for result in results if isinstance(result, Success))
+
+
+def failures(results: Iterable[Result[Y, E]]) -> Iterator[E]:
+    """yield the errors of the failures among results."""
+    return (result.value for result in results if isinstance(result, Failure))
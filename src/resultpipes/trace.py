@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from enum import Enum
+from itertools import count
+from logging import getLogger
+from threading import Lock
+from time import perf_counter, time
+from typing import Any, Callable, Iterator, NamedTuple, TypeAlias
+
+from .result import Failure, Success
+
+log = getLogger(__name__)
+
+
+class Outcome(Enum):
+    SUCCESS = "success"
+    FAILURE = "failure"
+    ERROR = "error"
+
+
+class Span(NamedTuple):
+    """the record of one invocation of a stage, or of a pipeline of several stages.
+
+    start is a time.time() timestamp and duration is in seconds. parent_id is the span_id of the span
+    in progress when this one started, if any. error is the type name of the Failure value or of the
+    exception raised, if any.
+    """
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    start: float
+    duration: float
+    outcome: Outcome
+    error: str | None = None
+
+
+Exporter: TypeAlias = Callable[[Span], None]
+# a meter is passed the name of each stage that runs, its duration in seconds, and its result or the exception it raised.
+Meter: TypeAlias = Callable[[str, float, Any], None]
+
+# Pipelines check _hooks, the exporters and meters together, on every call, and time stages only if it is not
+# empty, so that tracing costs next to nothing while there are none. The lists are only ever changed in place.
+_exporters: list[Exporter] = []
+_meters: list[Meter] = []
+_hooks: list[Exporter | Meter] = []
+_exporters_lock = Lock()
+_parent: ContextVar[int | None] = ContextVar("resultpipes_span", default=None)
+_ids = count(1)
+
+
+def add_exporter(exporter: Exporter) -> None:
+    """start tracing; exporter is called with each Span as it ends."""
+    with _exporters_lock:
+        _exporters.append(exporter)
+        _hooks.append(exporter)
+
+
+def remove_exporter(exporter: Exporter) -> None:
+    """stop passing spans to exporter; tracing stops when no exporter is left."""
+    with _exporters_lock:
+        _exporters.remove(exporter)
+        _hooks.remove(exporter)
+
+
+@contextmanager
+def tracing(exporter: Exporter) -> Iterator[Exporter]:
+    """add exporter for the duration of a with block."""
+    add_exporter(exporter)
+    try:
+        yield exporter
+    finally:
+        remove_exporter(exporter)
+
+
+def add_meter(meter: Meter) -> None:
+    """start metering; meter is called as each stage ends, with its name, duration and result.
+
+    Metering records no Span, so it costs much less than tracing.
+    """
+    with _exporters_lock:
+        _meters.append(meter)
+        _hooks.append(meter)
+
+
+def remove_meter(meter: Meter) -> None:
+    with _exporters_lock:
+        _meters.remove(meter)
+        _hooks.remove(meter)
+
+
+@contextmanager
+def metering(meter: Meter) -> Iterator[Meter]:
+    """add meter for the duration of a with block."""
+    add_meter(meter)
+    try:
+        yield meter
+    finally:
+        remove_meter(meter)
+
+
+class SpanRecorder:
+    """an exporter that keeps the spans it is passed, in the order they end."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def __call__(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class _Timer:
+    # a span in progress; it is the parent of spans started before it ends.
+    __slots__ = ("name", "span_id", "parent_id", "token", "start", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent_id = _parent.get()
+        self.token: Token[int | None] = _parent.set(self.span_id)
+        self.start = time()
+        self.started = perf_counter()
+
+    def end(self, result: Any) -> None:
+        duration = perf_counter() - self.started
+        _parent.reset(self.token)
+        if _meters:
+            _measure(self.name, duration, result)
+        if isinstance(result, Success):
+            outcome, error = Outcome.SUCCESS, None
+        elif isinstance(result, Failure):
+            outcome, error = Outcome.FAILURE, type(result.value).__name__
+        else:
+            outcome, error = Outcome.ERROR, type(result).__name__
+        _export(
+            Span(
+                self.name,
+                self.span_id,
+                self.parent_id,
+                self.start,
+                duration,
+                outcome,
+                error,
+            )
+        )
+
+
+def _export(span: Span) -> None:
+    for exporter in tuple(_exporters):
+        try:
+            exporter(span)
+        except Exception:
+            log.exception("span exporter %r failed", exporter)
+
+
+def _measure(name: str, seconds: float, result: Any) -> None:
+    # the list is iterated as is, to allocate nothing; a meter removed meanwhile may be skipped or called once more.
+    for meter in _meters:
+        try:
+            meter(name, seconds, result)
+        except Exception:
+            log.exception("meter %r failed", meter)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from contextlib import aclosing
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, TypeVar, overload
+
+from .pipe import APipeable, Pipeable
+from .result import Failure, Result, Success
+from .stream import _amap, amap, as_async_iterator
+
+X = TypeVar("X")
+Y = TypeVar("Y")
+E = TypeVar("E")
+
+
+def sequence(results: Iterable[Result[Y, E]]) -> Result[list[Y], E]:
+    """return Success(list of the values of results) if all succeed, or else the first Failure.
+
+    results is consumed only up to the first Failure, so a lazy iterable of results is not computed further.
+    """
+    values = []
+    for result in results:
+        if isinstance(result, Failure):
+            return result
+        values.append(result.value)
+    return Success(values)
+
+
+def sequence_all(results: Iterable[Result[Y, E]]) -> Result[list[Y], list[E]]:
+    """return Success(list of the values of results) if all succeed, or else Failure(list of all the errors)."""
+    values = []
+    errors = []
+    for result in results:
+        if isinstance(result, Success):
+            values.append(result.value)
+        else:
+            errors.append(result.value)
+    return Failure(errors) if errors else Success(values)
+
+
+@overload
+def traverse(
+    pipe: APipeable[X, Y, E], concurrency: int = 16
+) -> APipeable[Iterable[X] | AsyncIterable[X], list[Y], E]:
+    ...  # pragma: no cover
+
+
+@overload
+def traverse(
+    pipe: Pipeable[X, Y, E], concurrency: int = 16
+) -> Pipeable[Iterable[X], list[Y], E]:
+    ...  # pragma: no cover
+
+
+def traverse(
+    pipe: Pipeable[X, Y, E] | APipeable[X, Y, E], concurrency: int = 16
+) -> Pipeable[Iterable[X], list[Y], E] | APipeable[Any, list[Y], E]:
+    """return a pipeline that applies pipe to each of its inputs, with result Success(list of their values) if all
+    succeed, or else the first Failure; no more inputs are started after a Failure.
+
+    If pipe is an APipeable, so is the result, which runs at most concurrency calls at a time, returns the first
+    Failure to arrive, and cancels the calls still in flight.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if isinstance(pipe, APipeable):
+        apipe = pipe
+
+        async def indexed(item: tuple[int, X]) -> tuple[int, Result[Y, E]]:
+            index, x = item
+            return index, await apipe(x)
+
+        async def atraversed(
+            inputs: Iterable[X] | AsyncIterable[X],
+        ) -> Result[list[Y], E]:
+            values: dict[int, Y] = {}
+            items = as_async_iterator(inputs)
+            # as results arrive out of order, they are placed by index; leaving the loop cancels calls in flight.
+            async with aclosing(
+                _amap(indexed, _enumerate(items), concurrency, ordered=False)
+            ) as results:
+                async for index, result in results:
+                    if isinstance(result, Failure):
+                        return result
+                    values[index] = result.value
+            return Success([values[index] for index in range(len(values))])
+
+        return APipeable(atraversed)
+
+    def traversed(inputs: Iterable[X]) -> Result[list[Y], E]:
+        return sequence(map(pipe, inputs))
+
+    return Pipeable(traversed)
+
+
+async def _enumerate(items: AsyncIterable[X]) -> AsyncIterator[tuple[int, X]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
+
+@overload
+def traverse_all(
+    pipe: APipeable[X, Y, E], concurrency: int = 16
+) -> APipeable[Iterable[X] | AsyncIterable[X], list[Y], list[E]]:
+    ...  # pragma: no cover
+
+
+@overload
+def traverse_all(
+    pipe: Pipeable[X, Y, E], concurrency: int = 16
+) -> Pipeable[Iterable[X], list[Y], list[E]]:
+    ...  # pragma: no cover
+
+
+def traverse_all(
+    pipe: Pipeable[X, Y, E] | APipeable[X, Y, E], concurrency: int = 16
+) -> Pipeable[Iterable[X], list[Y], list[E]] | APipeable[Any, list[Y], list[E]]:
+    """return a pipeline that applies pipe to each of its inputs, with result Success(list of their values) if all
+    succeed, or else Failure(list of all the errors).
+
+    If pipe is an APipeable, so is the result, which runs at most concurrency calls at a time.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if isinstance(pipe, APipeable):
+        apipe = pipe
+
+        async def atraversed(
+            inputs: Iterable[X] | AsyncIterable[X],
+        ) -> Result[list[Y], list[E]]:
+            return sequence_all(
+                [result async for result in amap(apipe, inputs, concurrency)]
+            )
+
+        return APipeable(atraversed)
+
+    def traversed(inputs: Iterable[X]) -> Result[list[Y], list[E]]:
+        return sequence_all(map(pipe, inputs))
+
+    return Pipeable(traversed)
@@ -0,0 +1,35 @@
+from typing import Any, Callable
+
+import pytest
+
+
+class FakeClock:
+    """a clock for the clock argument of caches, breakers and limits, that moves only when now is set."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Recorder:
+    """a function of one argument that calls func, and keeps the arguments of its calls in calls."""
+
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.calls: list[Any] = []
+
+    def __call__(self, x: Any) -> Any:
+        self.calls.append(x)
+        return self.func(x)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def recorder() -> type[Recorder]:
+    return Recorder
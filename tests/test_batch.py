@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from resultpipes.batch import *
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+
+batches: list[list[int]] = []
+
+
+@batched(max_size=3, max_delay=0.01)
+async def lookup(xs: list[int]) -> list[Result[int, int]]:
+    batches.append(xs)
+    return [Success(x * 10) if x >= 0 else Failure(x) for x in xs]
+
+
+@pipeable
+def add_one(x: int) -> Result[int, int]:
+    return Success(x + 1)
+
+
+@pytest.fixture(autouse=True)
+def clear_batches():
+    batches.clear()
+
+
+@pytest.mark.asyncio
+async def test_batched():
+    results = await asyncio.gather(*(lookup(x) for x in [1, 2, -3, 4, 5]))
+    assert results == [Success(10), Success(20), Failure(-3), Success(40), Success(50)]
+    assert batches == [[1, 2, -3], [4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_batched_composes():
+    p = lookup | add_one
+    assert await asyncio.gather(p(1), p(-1)) == [Success(11), Failure(-1)]
+    assert batches == [[1, -1]]
+
+
+@pytest.mark.asyncio
+async def test_batched_sync():
+    @batched(max_size=10, max_delay=0)
+    def double(xs: list[int]) -> list[Result[int, int]]:
+        batches.append(xs)
+        return [Success(2 * x) for x in xs]
+
+    assert await asyncio.gather(double(1), double(2)) == [Success(2), Success(4)]
+    assert batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_batched_cancelled_caller():
+    first = asyncio.ensure_future(lookup(1))
+    second = asyncio.ensure_future(lookup(2))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == Success(20)
+    assert batches == [[2]]
+
+
+@pytest.mark.asyncio
+async def test_batched_raises():
+    @batched()
+    async def wrong(xs: list[int]) -> list[Result[int, int]]:
+        return []
+
+    with pytest.raises(ValueError):
+        await asyncio.gather(wrong(1), wrong(2))
+
+
+def test_batched_invalid():
+    with pytest.raises(ValueError):
+        batched(max_size=0)
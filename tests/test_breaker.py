@@ -0,0 +1,165 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from resultpipes.breaker import *
+from resultpipes.pipe import APipeable, Pipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+def dependency(up: list[bool]) -> Callable[[int], Result[int, str]]:
+    def call(x: int) -> Result[int, str]:
+        return Success(x) if up[0] else Failure("down")
+
+    return call
+
+
+def test_breaker_opens_and_recovers(clock, recorder):
+    up = [False]
+    call = recorder(dependency(up))
+    breaker = CircuitBreaker(min_calls=4, window=10, reset_timeout=5, clock=clock)
+    p = breaker(pipeable(call))
+    assert isinstance(p, Pipeable)
+    assert [p(x) for x in range(4)] == [Failure("down")] * 4
+    assert breaker.state is State.OPEN
+    match p(5):
+        case Failure(CircuitOpen()):
+            pass
+        case _:
+            assert False
+    assert call.calls == [0, 1, 2, 3]
+
+    clock.now = 5
+    assert breaker.state is State.HALF_OPEN
+    assert p(6) == Failure("down")
+    assert breaker.state is State.OPEN
+
+    clock.now = 10
+    up[0] = True
+    assert p(7) == Success(7)
+    assert breaker.state is State.CLOSED
+
+
+def test_breaker_failure_rate():
+    up = [True]
+    call = dependency(up)
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=4)
+    guarded = breaker(call)
+    for x in range(3):
+        guarded(x)
+    up[0] = False
+    guarded(3)
+    assert breaker.state is State.CLOSED
+    guarded(4)
+    assert breaker.state is State.OPEN
+
+
+def test_breaker_slow_calls(clock):
+    def slow(x: int) -> Result[int, str]:
+        clock.now += 2
+        return Success(x)
+
+    breaker = CircuitBreaker(min_calls=2, slow_call=1, clock=clock)
+    guarded = breaker(slow)
+    guarded(1), guarded(2)
+    assert breaker.state is State.OPEN
+
+
+def test_breaker_exceptions():
+    def boom(x: int) -> Result[int, str]:
+        raise ValueError()
+
+    breaker = CircuitBreaker(min_calls=1)
+    with pytest.raises(ValueError):
+        breaker(boom)(1)
+    assert breaker.state is State.OPEN
+
+
+@pytest.mark.asyncio
+async def test_breaker_async_fallback():
+    @pipeable
+    async def down(x: int) -> Result[int, object]:
+        return Failure("down")
+
+    @pipeable
+    def degraded(error: object) -> Result[int, object]:
+        return Success(-1) if isinstance(error, CircuitOpen) else Failure(error)
+
+    breaker = CircuitBreaker(min_calls=1, name="db")
+    p = breaker(down)
+    assert isinstance(p, APipeable)
+    q = p & degraded
+    assert await q(1) == Failure("down")
+    assert await q(1) == Success(-1)
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_cancelled(clock):
+    release = asyncio.Event()
+
+    async def call(x: int) -> Result[int, str]:
+        await release.wait()
+        return Failure("down") if x < 0 else Success(x)
+
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=1, clock=clock)
+    guarded = breaker(call)
+    release.set()
+    await guarded(-1)
+    clock.now = 1
+    release.clear()
+    trial = asyncio.ensure_future(guarded(1))
+    await asyncio.sleep(0)
+    match await guarded(2):
+        case Failure(CircuitOpen()):
+            pass
+        case _:
+            assert False
+    trial.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await guarded(3) == Success(3)
+    assert breaker.state is State.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_stale_outcomes(clock):
+    gates: dict[int, asyncio.Event] = {}
+
+    async def call(x: int) -> Result[int, str]:
+        gate = gates.setdefault(x, asyncio.Event())
+        await gate.wait()
+        return Failure("down") if x < 0 else Success(x)
+
+    breaker = CircuitBreaker(min_calls=2, window=2, reset_timeout=1, clock=clock)
+    guarded = breaker(call)
+    # calls that start while the breaker is closed, and end after it has opened.
+    slow_success = asyncio.ensure_future(guarded(1))
+    slow_failure = asyncio.ensure_future(guarded(-1))
+    await asyncio.sleep(0)
+    for x in (-2, -3):
+        gates[x] = asyncio.Event()
+        gates[x].set()
+        await guarded(x)
+    assert breaker.state is State.OPEN
+
+    clock.now = 1
+    trial = asyncio.ensure_future(guarded(2))
+    await asyncio.sleep(0)
+    assert breaker.state is State.HALF_OPEN
+    gates[1].set()
+    gates[-1].set()
+    await asyncio.gather(slow_success, slow_failure)
+    assert breaker.state is State.HALF_OPEN
+    gates[2].set()
+    assert await trial == Success(2)
+    assert breaker.state is State.CLOSED
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"failure_rate": 0}, {"half_open_calls": 0}, {"min_calls": 11, "window": 10}],
+)
+def test_breaker_invalid(kwargs: dict[str, Any]):
+    with pytest.raises(ValueError):
+        CircuitBreaker(**kwargs)
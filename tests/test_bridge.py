@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from resultpipes.bridge import *
+from resultpipes.deadline import DeadlineExceeded
+from resultpipes.pipe import Pipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+@pipeable
+async def double(x: int) -> Result[int, str]:
+    await asyncio.sleep(0)
+    return Success(2 * x)
+
+
+@pipeable
+async def slow(x: float) -> Result[float, str]:
+    await asyncio.sleep(x)
+    return Success(x)
+
+
+def test_bridge_call():
+    with LoopBridge() as bridge:
+        assert bridge.call(double, 2) == Success(4)
+        assert bridge.submit(double, 3).result() == Success(6)
+        assert bridge.map(double, range(5)) == [Success(2 * x) for x in range(5)]
+
+
+def test_bridge_keeps_loop():
+    loops = set()
+
+    @pipeable
+    async def loop_of(x: int) -> Result[int, str]:
+        loops.add(asyncio.get_running_loop())
+        return Success(x)
+
+    with LoopBridge() as bridge:
+        sync = bridge.sync(loop_of)
+        assert isinstance(sync, Pipeable)
+        assert [sync(x) for x in range(3)] == [Success(x) for x in range(3)]
+        assert loops == {bridge.loop}
+
+
+def test_bridge_threads():
+    with LoopBridge() as bridge, ThreadPoolExecutor(8) as executor:
+        sync = bridge.sync(double)
+        assert list(executor.map(sync, range(100))) == [
+            Success(2 * x) for x in range(100)
+        ]
+
+
+def test_bridge_timeout():
+    cancelled = False
+
+    @pipeable
+    async def hang(x: int) -> Result[int, str]:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return Success(x)
+
+    with LoopBridge() as bridge:
+        result = bridge.call(hang, 1, timeout=0.01)
+        assert isinstance(result, Failure)
+        assert isinstance(result.value, DeadlineExceeded)
+        assert cancelled
+        results = bridge.map(slow, [0, 10, 0], timeout=0.05)
+        assert [type(result) for result in results] == [Success, Failure, Success]
+
+
+def test_bridge_own_loop():
+    with LoopBridge() as bridge:
+        sync = bridge.sync(double)
+
+        @pipeable
+        async def nested(x: int) -> Result[int, str]:
+            return sync(x)
+
+        with pytest.raises(RuntimeError):
+            bridge.call(nested, 1)
+
+
+def test_bridge_close_cancels():
+    bridge = LoopBridge()
+    future = bridge.submit(slow, 10)
+    bridge.close()
+    assert future.cancelled()
+    bridge.close()
+
+
+def test_bridged():
+    assert bridged(double)(1) == Success(2)
+    assert shared_bridge() is shared_bridge()
@@ -0,0 +1,107 @@
+import pytest
+
+from resultpipes.cache import *
+from resultpipes.pipe import APipeable, Pipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+def positive(x: int) -> Result[int, int]:
+    return Success(x) if x >= 0 else Failure(x)
+
+
+def test_cache_function(recorder):
+    cache = ResultCache()
+    f = recorder(positive)
+    cached = cache(f)
+    assert [cached(x) for x in [1, 2, 1, 1]] == [Success(x) for x in [1, 2, 1, 1]]
+    assert f.calls == [1, 2]
+    assert cache.stats == CacheStats(
+        hits=2, misses=2, evictions=0, expirations=0, size=2
+    )
+
+
+def test_cache_lru(recorder):
+    cache = ResultCache(maxsize=2)
+    f = recorder(positive)
+    cached = cache(f)
+    for x in [1, 2, 1, 3, 1, 2]:
+        cached(x)
+    assert f.calls == [1, 2, 3, 2]
+    assert cache.stats.evictions == 2
+
+
+def test_cache_ttl(clock, recorder):
+    cache = ResultCache(ttl=10, failure_ttl=1, clock=clock)
+    f = recorder(positive)
+    cached = cache(f)
+    cached(1), cached(-1)
+    clock.now = 5
+    cached(1), cached(-1)
+    clock.now = 11
+    cached(1), cached(-1)
+    assert f.calls == [1, -1, -1, 1, -1]
+    assert cache.stats.expirations == 3
+
+
+def test_cache_failures_not_cached(recorder):
+    cache = ResultCache()
+    f = recorder(positive)
+    cached = cache(f)
+    cached(-1), cached(-1)
+    assert f.calls == [-1, -1]
+
+
+def test_cache_key():
+    cache = ResultCache(key=tuple)
+
+    @pipeable
+    @cache
+    def total(xs: list[int]) -> Result[int, int]:
+        return Success(sum(xs))
+
+    assert total([1, 2]) == Success(3)
+    assert total([1, 2]) == Success(3)
+    assert cache.stats.hits == 1
+
+
+def test_cache_pipeable(recorder):
+    cache = ResultCache()
+    f = recorder(positive)
+    p = cache(pipeable(f))
+    assert isinstance(p, Pipeable)
+    p(1), p(1)
+    assert f.calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_cache_apipeable(recorder):
+    cache = ResultCache()
+    f = recorder(positive)
+
+    @pipeable
+    async def af(x: int) -> Result[int, int]:
+        return f(x)
+
+    p = cache(af)
+    assert isinstance(p, APipeable)
+    assert [await p(1), await p(1)] == [Success(1), Success(1)]
+    assert f.calls == [1]
+
+    q = ResultCache()(af.func)
+    assert [await q(2), await q(2)] == [Success(2), Success(2)]
+    assert f.calls == [1, 2]
+
+
+def test_cache_clear(recorder):
+    cache = ResultCache()
+    f = recorder(positive)
+    cached = cache(f)
+    cached(1)
+    cache.clear()
+    cached(1)
+    assert f.calls == [1, 1]
+
+
+def test_cache_invalid():
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
@@ -1,6 +1,7 @@
 import pytest
 
 from resultpipes.catch import *
+from resultpipes.result import Success
 
 
 def test_log_exception():
@@ -58,3 +59,64 @@ async def test_acatch():
                     assert False
         case _:
             assert False
+
+
+def boom(message: str) -> None:
+    raise ValueError(message)
+
+
+def test_error_record():
+    try:
+        boom("bad")
+    except ValueError as exc:
+        record = ErrorRecord.of(exc, frames=2)
+    assert record.type is ValueError
+    assert record.message == "bad"
+    assert str(record) == "ValueError: bad"
+    assert len(record.where) == 2
+    assert record.where[-1].endswith(" in boom")
+    assert "test_catch.py:" in record.where[-1]
+    assert ErrorRecord.of(KeyError(), frames=0) == ErrorRecord(KeyError, "")
+    assert str(ErrorRecord(KeyError, "")) == "KeyError"
+
+
+def test_catch_error_log(caplog: pytest.LogCaptureFixture):
+    now = 0.0
+    errors = ErrorLog(interval=10, clock=lambda: now)
+
+    @catch(errors)
+    def f(x: str) -> Result[int, ErrorRecord]:
+        if x == "other":
+            raise KeyError(x)
+        boom(x)
+        return Success(0)
+
+    results = [f(str(n)) for n in range(5)]
+    records = [result.value for result in results]
+    assert all(isinstance(record, ErrorRecord) for record in records)
+    messages = [record.message for record in records if isinstance(record, ErrorRecord)]
+    assert messages == ["0", "1", "2", "3", "4"]
+    other = f("other").value
+    assert isinstance(other, ErrorRecord) and other.type is KeyError
+    assert len(caplog.records) == 2
+    assert errors.suppressed == 4
+    now = 11
+    f("5")
+    assert len(caplog.records) == 3
+    assert caplog.records[-1].getMessage() == "ValueError: 5 (4 more suppressed)"
+    assert caplog.records[-1].exc_info is not None
+
+
+@pytest.mark.asyncio
+async def test_acatch_error_log():
+    errors = ErrorLog()
+
+    @acatch(errors)
+    async def f(x: str) -> Result[int, ErrorRecord]:
+        boom(x)
+        return Success(0)
+
+    result = await f("x")
+    assert isinstance(result, Failure)
+    assert isinstance(result.value, ErrorRecord)
+    assert result.value.where[-1].endswith(" in boom")
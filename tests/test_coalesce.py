@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from resultpipes.coalesce import *
+from resultpipes.pipe import APipeable, pipeable
+from resultpipes.result import Result, Success
+
+
+def slow_lookup():
+    calls: list[int] = []
+    release = asyncio.Event()
+
+    async def lookup(x: int) -> Result[int, str]:
+        calls.append(x)
+        await release.wait()
+        return Success(x)
+
+    return lookup, calls, release
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    lookup, calls, release = slow_lookup()
+    flights = SingleFlight()
+    p = flights(pipeable(lookup))
+    assert isinstance(p, APipeable)
+    tasks = [asyncio.ensure_future(p(x)) for x in [1, 1, 2, 1]]
+    await asyncio.sleep(0)
+    assert flights.in_flight == 2
+    release.set()
+    assert await asyncio.gather(*tasks) == [Success(x) for x in [1, 1, 2, 1]]
+    assert calls == [1, 2]
+    assert flights.in_flight == 0
+    assert await p(1) == Success(1)
+    assert calls == [1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancel_one():
+    lookup, calls, release = slow_lookup()
+    coalesced = SingleFlight(key=str)(lookup)
+    first = asyncio.ensure_future(coalesced(1))
+    second = asyncio.ensure_future(coalesced(1))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == Success(1)
+    assert first.cancelled()
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancel_all():
+    cancelled = False
+
+    async def lookup(x: int) -> Result[int, str]:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return Success(x)
+
+    flights = SingleFlight()
+    coalesced = flights(lookup)
+    waiter = asyncio.ensure_future(coalesced(1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert cancelled
+    assert flights.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_exception():
+    async def lookup(x: int) -> Result[int, str]:
+        await asyncio.sleep(0)
+        raise ValueError()
+
+    coalesced = SingleFlight()(lookup)
+    results = await asyncio.gather(coalesced(1), coalesced(1), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,118 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from resultpipes.columnar import *  # noqa: E402
+from resultpipes.pipe import pipeable  # noqa: E402
+from resultpipes.result import Failure, Result, Success  # noqa: E402
+
+
+@vectorized
+def positive(x):
+    return ResultBatch.masked(x, x > 0, "not positive")
+
+
+@vectorized
+def halve(x):
+    return ResultBatch.masked(x // 2, x % 2 == 0, "odd")
+
+
+@vectorized
+def square(x):
+    return x * x
+
+
+@vectorized
+def recover(errors):
+    ok = np.array([error == "odd" for error in errors])
+    return ResultBatch.masked(np.where(ok, -1, 0), ok, "unrecoverable")
+
+
+@pipeable
+def positive1(x: int) -> Result[int, str]:
+    return Success(x) if x > 0 else Failure("not positive")
+
+
+@pipeable
+def halve1(x: int) -> Result[int, str]:
+    return Success(x // 2) if x % 2 == 0 else Failure("odd")
+
+
+@pipeable
+def square1(x: int) -> Result[int, str]:
+    return Success(x * x)
+
+
+@pipeable
+def recover1(error: str) -> Result[int, str]:
+    return Success(-1) if error == "odd" else Failure("unrecoverable")
+
+
+def test_result_batch():
+    batch = ResultBatch([1, 2, 3], [True, False, True], {1: "no"})
+    assert len(batch) == 3
+    assert batch.to_results() == [Success(1), Failure("no"), Success(3)]
+    assert batch.successes.tolist() == [1, 3]
+    again = ResultBatch.from_results(batch)
+    assert again.ok.tolist() == [True, False, True]
+    assert again.values.tolist() == [1, 0, 3]
+    assert again.errors == {1: "no"}
+    assert ResultBatch([1, 2]).to_results() == [Success(1), Success(2)]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ([1, 2], [True, False], {}),
+        ([1, 2], [True], None),
+        (3, None, None),
+    ],
+)
+def test_result_batch_invalid(args):
+    with pytest.raises(ValueError):
+        ResultBatch(*args)
+
+
+@pytest.mark.parametrize(
+    "vector, scalar",
+    [
+        (positive | halve | square, positive1 | halve1 | square1),
+        (positive | halve & recover | square, positive1 | halve1 & recover1 | square1),
+        (positive | (halve & recover), positive1 | (halve1 & recover1)),
+        ((positive & recover) | halve, (positive1 & recover1) | halve1),
+        (positive & recover & recover, positive1 & recover1 & recover1),
+    ],
+)
+def test_vectorized_matches_scalar(vector, scalar):
+    inputs = np.array([-3, -2, 0, 1, 2, 3, 4, 6, 7, 8])
+    assert vector(inputs).to_results() == [scalar(int(x)) for x in inputs]
+
+
+def test_vectorized_result_route():
+    @vectorized
+    def count_failures(batch):
+        return np.full(len(batch), len(batch) - np.count_nonzero(batch.ok))
+
+    assert (positive ^ count_failures)(np.array([-1, 1, 2])).values.tolist() == [
+        1,
+        1,
+        1,
+    ]
+
+
+def test_vectorized_mixed_dtypes():
+    @vectorized
+    def label(errors):
+        return np.array(["missing"] * len(errors))
+
+    result = (positive & label)(np.array([1, -1]))
+    assert result.to_results() == [Success(1), Success("missing")]
+
+
+def test_vectorized_wrong_length():
+    @vectorized
+    def short(x):
+        return x[1:]
+
+    with pytest.raises(ValueError):
+        (positive | short)(np.array([1, 2]))
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from resultpipes.deadline import *
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+
+started: list[str] = []
+
+
+def stage(name: str, delay: float):
+    @pipeable
+    async def run(x: int) -> Result[int, str]:
+        started.append(name)
+        await asyncio.sleep(delay)
+        return Success(x)
+
+    return run
+
+
+@pipeable
+def fallback(error: object) -> Result[int, str]:
+    return Success(-1) if isinstance(error, DeadlineExceeded) else Failure("other")
+
+
+@pipeable
+def left(x: int) -> Result[float | None, str]:
+    return Success(remaining())
+
+
+@pytest.fixture(autouse=True)
+def clear_started():
+    started.clear()
+
+
+@pytest.mark.asyncio
+async def test_remaining():
+    assert remaining() is None
+    assert await with_deadline(left, 10)(1) == Success(pytest.approx(10, abs=0.1))
+    assert await with_deadline(left.offload(), 10)(1) == Success(
+        pytest.approx(10, abs=0.1)
+    )
+    nested = with_deadline(with_deadline(left, 10), 1)
+    assert await nested(1) == Success(pytest.approx(1, abs=0.1))
+
+
+@pytest.mark.asyncio
+async def test_with_deadline():
+    p = with_deadline(stage("a", 0) | stage("b", 0.01), 1)
+    assert await p(1) == Success(1)
+    p = with_deadline(stage("a", 0.05) | stage("b", 0), 0.01)
+    match await p(1):
+        case Failure(error):
+            assert isinstance(error, DeadlineExceeded)
+        case _:
+            assert False
+    assert started == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_with_timeout():
+    p = with_timeout(stage("a", 0.05), 0.01) & fallback
+    assert await p(1) == Success(-1)
+    assert await with_timeout(stage("a", 0))(1) == Success(1)
+
+
+@pytest.mark.asyncio
+async def test_with_timeout_uses_deadline():
+    p = with_deadline(stage("a", 0.03) | with_timeout(stage("b", 1), 5), 0.05)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    match await p(1):
+        case Failure(error):
+            assert isinstance(error, DeadlineExceeded)
+        case _:
+            assert False
+    assert loop.time() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_with_timeout_not_started():
+    inner = with_timeout(stage("late", 0)) & fallback
+
+    @pipeable
+    def spend(x: int) -> Result[int, str]:
+        time.sleep(0.02)
+        return Success(x)
+
+    p = with_deadline(spend | inner, 0.01)
+    assert await p(1) == Success(-1)
+    assert started == []
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_error():
+    @pipeable
+    async def timed_out(x: int) -> Result[int, str]:
+        raise TimeoutError("stage")
+
+    for p in (with_deadline(timed_out, 1), with_timeout(timed_out, 1)):
+        with pytest.raises(TimeoutError, match="stage") as info:
+            await p(1)
+        assert not isinstance(info.value, DeadlineExceeded)
+        assert info.value.__context__ is None
@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import resultpipes
+from resultpipes.diskcache import *
+from resultpipes.pipe import APipeable, Pipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+calls: list[str] = []
+
+
+def parse(x: str) -> Result[int, str]:
+    calls.append(x)
+    try:
+        return Success(int(x))
+    except ValueError:
+        return Failure(x)
+
+
+def test_disk_cache(tmp_path):
+    calls.clear()
+    cache = DiskCache(tmp_path / "cache.db")
+    cached = cache(parse)
+    assert [cached(x) for x in ["1", "2", "1", "x", "x"]] == [
+        Success(1),
+        Success(2),
+        Success(1),
+        Failure("x"),
+        Failure("x"),
+    ]
+    assert calls == ["1", "2", "x", "x"]
+    assert cache.stats[:4] == (1, 4, 0, 2)
+    cache.clear()
+    assert cache.stats.entries == 0
+    assert cache.stats.bytes == 0
+
+
+def test_disk_cache_persists(tmp_path):
+    calls.clear()
+    path = tmp_path / "cache.db"
+    DiskCache(path, failures=True)(parse)("1")
+    DiskCache(path, failures=True)(parse)("x")
+    assert DiskCache(path, failures=True)(parse)("1") == Success(1)
+    assert DiskCache(path, failures=True)(parse)("x") == Failure("x")
+    assert calls == ["1", "x"]
+    assert DiskCache(path, version="2")(parse)("1") == Success(1)
+    assert calls == ["1", "x", "1"]
+
+
+def test_disk_cache_pipeable(tmp_path):
+    calls.clear()
+    cached = DiskCache(tmp_path / "cache.db")(pipeable(parse))
+    assert isinstance(cached, Pipeable)
+    assert [cached("1"), cached("1")] == [Success(1), Success(1)]
+    assert calls == ["1"]
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=300, touch_interval=0)
+    for n in range(10):
+        cache.put(n, Success(b"x" * 50))
+    stats = cache.stats
+    assert stats.bytes <= 300
+    assert cache.get(0) is None
+    assert cache.get(9) == Success(b"x" * 50)
+    assert stats.evictions == 10 - stats.entries
+    cache.put(9, Success(b"y"))
+    assert cache.stats.bytes < stats.bytes
+
+
+def test_disk_cache_oversized_value(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=1000)
+    for n in range(10):
+        cache.put(n, Success(b"x" * 50))
+    cache.put("big", Success(b"x" * 5000))
+    assert cache.get("big") is None
+    assert cache.stats.entries == 10
+    assert cache.stats.evictions == 0
+
+
+def test_disk_cache_drifted_total(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=1000)
+    cache._connection().execute("UPDATE totals SET bytes = 10000")
+    cache.put(1, Success(b"x"))
+    assert cache.get(1) is None
+    cache.put(1, Success(b"x"))
+    assert cache.get(1) == Success(b"x")
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (1, True),
+        (1, 1.0),
+        ("1", 1),
+        ((1, 2), [1, 2]),
+        (("ab", "c"), ("a", "bc")),
+        ({"a": 1}, {"a": 2}),
+        ({1, 2}, {1, 3}),
+    ],
+)
+def test_stable_key_distinct(a, b):
+    assert stable_key(a) != stable_key(b)
+
+
+def test_stable_key_sets():
+    words = [f"w{n}" for n in range(50)]
+    src = os.path.dirname(os.path.dirname(resultpipes.__file__))
+    script = (
+        "import sys; from resultpipes.diskcache import stable_key; "
+        f"sys.stdout.buffer.write(stable_key({{'k': set({words!r})}}))"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            env={"PYTHONPATH": src, "PYTHONHASHSEED": str(seed)},
+        ).stdout
+        for seed in range(3)
+    }
+    assert outputs == {stable_key({"k": set(words)})}
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_async(tmp_path):
+    count = 0
+
+    @pipeable
+    async def fetch(x: int) -> Result[int, str]:
+        nonlocal count
+        count += 1
+        await asyncio.sleep(0)
+        return Success(x * 2)
+
+    cached = DiskCache(tmp_path / "cache.db")(fetch)
+    assert isinstance(cached, APipeable)
+    assert [await cached(1), await cached(1)] == [Success(2), Success(2)]
+    assert count == 1
+
+
+def fill(path: str, start: int) -> int:
+    cache = DiskCache(path, max_bytes=10_000)
+    hits = 0
+    for n in range(start, start + 200):
+        key = n % 100
+        if cache.get(key) is None:
+            cache.put(key, Success(key))
+        else:
+            hits += 1
+    return hits
+
+
+def test_disk_cache_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    DiskCache(path)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(4, mp_context=context) as executor:
+        hits = list(executor.map(fill, [path] * 4, [0, 25, 50, 75]))
+    assert sum(hits) >= 4 * 100
+    cache = DiskCache(path)
+    assert [cache.get(n) for n in range(100)] == [Success(n) for n in range(100)]
+    assert cache.stats.entries == 100
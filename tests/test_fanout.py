@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from resultpipes.fanout import *
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+
+cancelled: list[str] = []
+
+
+def source(name: str, delay: float, ok: bool):
+    @pipeable
+    async def lookup(x: int) -> Result[str, str]:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return Success(f"{name}{x}") if ok else Failure(name)
+
+    return lookup
+
+
+@pipeable
+def local(x: int) -> Result[str, str]:
+    return Failure("local")
+
+
+@pytest.fixture(autouse=True)
+def clear_cancelled():
+    cancelled.clear()
+
+
+@pytest.mark.asyncio
+async def test_gather():
+    p = gather(source("a", 0.01, True), source("b", 0, False), local)
+    assert await p(1) == Success([Success("a1"), Failure("b"), Failure("local")])
+
+
+@pytest.mark.asyncio
+async def test_gather_concurrent():
+    p = gather(*(source(str(n), 0.05, True) for n in range(5)))
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await p(1)
+    assert loop.time() - start < 0.2
+
+
+@pytest.mark.asyncio
+async def test_fail_fast():
+    assert await fail_fast(source("a", 0, True), source("b", 0, True))(1) == Success(
+        ["a1", "b1"]
+    )
+    p = fail_fast(source("a", 1, True), source("b", 0, False))
+    assert await p(1) == Failure("b")
+    await asyncio.sleep(0)
+    assert cancelled == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_race():
+    p = race(source("slow", 1, True), source("fast", 0.01, True), local)
+    assert await p(1) == Success("fast1")
+    await asyncio.sleep(0)
+    assert cancelled == ["slow"]
+    p = race(source("a", 0, False), local)
+    assert await p(1) == Failure(["a", "local"])
+
+
+@pytest.mark.asyncio
+async def test_race_composes():
+    @pipeable
+    def upper(s: str) -> Result[str, str]:
+        return Success(s.upper())
+
+    p = race(source("a", 0, True), source("b", 0.1, True)) | upper
+    assert await p(1) == Success("A1")
+
+
+@pytest.mark.asyncio
+async def test_fanout_raises():
+    @pipeable
+    async def boom(x: int) -> Result[str, str]:
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await gather(source("a", 1, True), boom)(1)
+    await asyncio.sleep(0)
+    assert cancelled == ["a"]
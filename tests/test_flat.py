@@ -0,0 +1,266 @@
+import asyncio
+from typing import Any, AsyncIterator, Iterator, cast
+
+import pytest
+
+from resultpipes.flat import *
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+@flat_map
+def digits(x: int) -> Iterator[Result[int, str]]:
+    if x < 0:
+        yield Failure(f"negative {x}")
+        return
+    for digit in str(x):
+        yield Success(int(digit))
+
+
+@flat_map
+async def adigits(x: int) -> AsyncIterator[Result[int, str]]:
+    async for result in aiter_of(digits(x)):
+        yield result
+
+
+async def aiter_of(results):
+    for result in results:
+        await asyncio.sleep(0)
+        yield result
+
+
+@pipeable
+def odd(x: int) -> Result[int, str]:
+    return Success(x) if x % 2 else Failure(f"even {x}")
+
+
+@pipeable
+def parse(s: str) -> Result[int, str]:
+    return Success(int(s)) if s.lstrip("-").isdigit() else Failure(f"bad {s}")
+
+
+@pipeable
+def recover(e: str) -> Result[int, str]:
+    return Success(-1)
+
+
+@pipeable
+def describe(result: Result[int, str]) -> Result[str, str]:
+    return Success(f"{type(result).__name__} {result.value}")
+
+
+@pipeable
+async def adouble(x: int) -> Result[int, str]:
+    await asyncio.sleep(0)
+    return Success(2 * x)
+
+
+async def collect(results: AsyncIterator[Result[int, str]]) -> list[Result[int, str]]:
+    return [result async for result in results]
+
+
+def test_flat_map_sync():
+    assert isinstance(digits, FlatPipeable)
+    assert list(digits(123)) == [Success(1), Success(2), Success(3)]
+    assert list(digits(-1)) == [Failure("negative -1")]
+
+
+def test_flat_map_compose_after():
+    pipe = digits | odd
+    assert isinstance(pipe, FlatPipeable)
+    assert list(pipe(123)) == [Success(1), Failure("even 2"), Success(3)]
+    assert list((digits | odd & recover)(12)) == [Success(1), Success(-1)]
+    assert list((digits ^ describe)(-1)) == [Success("Failure negative -1")]
+
+
+def test_flat_map_compose_before():
+    pipe = parse | digits | odd
+    assert isinstance(pipe, FlatPipeable)
+    assert list(pipe("31")) == [Success(3), Success(1)]
+    # a failure before the expansion passes on as a single result.
+    assert list(pipe("x")) == [Failure("bad x")]
+    assert list((parse | digits & recover)("-5")) == [Success(-1)]
+
+
+@pytest.mark.asyncio
+async def test_flat_map_compose_named():
+    @flat_map
+    def both(result: Result[int, str]) -> Iterator[Result[int, str]]:
+        yield result
+        yield result
+
+    flat: Any = digits
+    pipe = parse.pipe_success(flat)
+    assert isinstance(pipe, FlatPipeable)
+    assert list(pipe("31")) == [Success(3), Success(1)]
+    assert list(parse.pipe_failure(cast(Any, recover | digits))("x")) == [
+        Failure("negative -1")
+    ]
+    assert list(parse.pipe_result(both)("x")) == [Failure("bad x")] * 2
+    assert isinstance(adouble.pipe_failure(cast(Any, recover | digits)), AFlatPipeable)
+    assert await collect(adouble.pipe_result(both)(12)) == [Success(24)] * 2
+    with pytest.raises(TypeError):
+        parse.pipe_success(cast(Any, 1))
+    with pytest.raises(TypeError):
+        adouble.pipe_failure(cast(Any, 1))
+
+
+def test_flat_map_nested():
+    @flat_map
+    def repeat(x: int) -> Iterator[Result[int, str]]:
+        for _ in range(x):
+            yield Success(x)
+
+    assert list((digits | repeat)(23)) == [Success(2)] * 2 + [Success(3)] * 3
+    # not spliceable, so kept as an expanding stage of its own.
+    pipe = parse | (repeat & recover)
+    assert list(pipe("2")) == [Success(2), Success(2)]
+    assert list(pipe("x")) == [Failure("bad x")]
+
+
+def test_flat_map_lazy():
+    pulled = []
+
+    @flat_map
+    def count_up(x: int) -> Iterator[Result[int, str]]:
+        for y in range(x):
+            pulled.append(y)
+            yield Success(y)
+
+    results = (count_up | odd)(1_000_000)
+    assert next(results) == Failure("even 0")
+    assert next(results) == Success(1)
+    assert pulled == [0, 1]
+    results.close()
+
+
+def test_flat_map_imap():
+    assert list((digits | odd).imap([13, 5])) == [Success(1), Success(3), Success(5)]
+
+
+@pytest.mark.asyncio
+async def test_flat_map_async():
+    assert isinstance(adigits, AFlatPipeable)
+    assert await collect(adigits(45)) == [Success(4), Success(5)]
+    pipe = parse | adigits | adouble
+    assert isinstance(pipe, AFlatPipeable)
+    assert await collect(pipe("45")) == [Success(8), Success(10)]
+    assert await collect(pipe("x")) == [Failure("bad x")]
+    pipe = digits | adouble
+    assert isinstance(pipe, AFlatPipeable)
+    assert await collect(pipe(12)) == [Success(2), Success(4)]
+    assert await collect((adouble | digits)(6)) == [Success(1), Success(2)]
+
+
+@pytest.mark.asyncio
+async def test_flat_map_amap():
+    pipe = adigits | odd
+    assert await collect(pipe.amap([13, 2])) == [
+        Success(1),
+        Success(3),
+        Failure("even 2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flat_map_concurrency():
+    running = 0
+    peak = 0
+
+    @pipeable
+    async def tracked(x: int) -> Result[int, str]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (5 - x % 5))
+        running -= 1
+        return Success(x)
+
+    @flat_map(concurrency=4)
+    def count_up(x: int) -> Iterator[Result[int, str]]:
+        for y in range(x):
+            yield Success(y)
+
+    results = await collect((count_up | tracked)(20))
+    assert results == [Success(y) for y in range(20)]
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_flat_map_concurrency_bounded_buffering():
+    pulled = 0
+
+    @flat_map(concurrency=2)
+    def archives(n: int) -> Iterator[Result[int, str]]:
+        for archive in range(n):
+            yield Success(archive)
+
+    @flat_map
+    async def records(archive: int) -> AsyncIterator[Result[int, str]]:
+        nonlocal pulled
+        for record in range(1000):
+            pulled += 1
+            yield Success(1000 * archive + record)
+
+    results = (archives | records | adouble)(3)
+    assert [await anext(results) for _ in range(3)] == [
+        Success(0),
+        Success(2),
+        Success(4),
+    ]
+    await asyncio.sleep(0.01)
+    # each of the two branches in flight holds at most one record ahead.
+    assert pulled <= 3 + 2 * 2
+    await results.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flat_map_concurrency_raises():
+    @flat_map(concurrency=3)
+    def count_up(x: int) -> Iterator[Result[int, str]]:
+        for y in range(x):
+            yield Success(y)
+
+    @pipeable
+    async def fragile(x: int) -> Result[int, str]:
+        if x == 2:
+            raise RuntimeError(x)
+        return Success(x)
+
+    results = (count_up | fragile)(5)
+    assert [await anext(results) for _ in range(2)] == [Success(0), Success(1)]
+    with pytest.raises(RuntimeError):
+        await anext(results)
+
+
+@pytest.mark.asyncio
+async def test_flat_map_closes():
+    closed = []
+
+    @flat_map
+    async def forever(x: int) -> AsyncIterator[Result[int, str]]:
+        try:
+            while True:
+                yield Success(x)
+        finally:
+            closed.append(x)
+
+    results = (forever | adouble)(3)
+    assert await anext(results) == Success(6)
+    await results.aclose()
+    assert closed == [3]
+
+
+def test_flat_map_explain():
+    assert (parse | digits | odd).explain() == "\n".join(
+        [
+            "^ parse (sync)",
+            "| digits (sync generator)",
+            "| odd (sync)",
+        ]
+    )
+
+
+def test_flat_map_concurrency_invalid():
+    with pytest.raises(ValueError):
+        flat_map(concurrency=0)
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from resultpipes.hedge import *
+from resultpipes.pipe import APipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+def backend(delays: list[float], results: list[Result[int, str]] | None = None):
+    calls: list[int] = []
+    cancelled: list[int] = []
+
+    async def lookup(x: int) -> Result[int, str]:
+        n = len(calls)
+        calls.append(n)
+        try:
+            await asyncio.sleep(delays[n % len(delays)])
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return results[n % len(results)] if results else Success(n)
+
+    return lookup, calls, cancelled
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_needed():
+    lookup, calls, _ = backend([0])
+    hedge = Hedge(delay=0.05)
+    p = hedge(pipeable(lookup))
+    assert isinstance(p, APipeable)
+    assert await p(1) == Success(0)
+    assert calls == [0]
+    assert hedge.stats == HedgeStats(calls=1, hedged=0, hedge_wins=0, delay=0.05)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins():
+    lookup, calls, cancelled = backend([1, 0])
+    hedge = Hedge(delay=0.01, max_extra=1)
+    assert await hedge(lookup)(1) == Success(1)
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+    assert hedge.stats[:3] == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_hedge_failure_waits_for_other():
+    lookup, calls, _ = backend([0.02, 0], [Success(0), Failure("hedge")])
+    hedge = Hedge(delay=0.01, max_extra=1)
+    assert await hedge(lookup)(1) == Success(0)
+    assert hedge.stats[:3] == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_hedge_both_fail():
+    lookup, _, _ = backend([0.02, 0], [Failure("primary"), Failure("hedge")])
+    assert await Hedge(delay=0.01, max_extra=1)(lookup)(1) == Failure("hedge")
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget():
+    lookup, calls, _ = backend([0.01])
+    hedge = Hedge(delay=0, max_extra=0.25)
+    hedged = hedge(lookup)
+    for _ in range(3):
+        await hedged(1)
+    assert hedge.stats.hedged == 0
+    for _ in range(5):
+        await hedged(1)
+    assert hedge.stats.hedged == 2
+    assert len(calls) == 10
+
+
+@pytest.mark.asyncio
+async def test_hedge_percentile():
+    lookup, _, _ = backend([0.001] * 9 + [0.02])
+    hedge = Hedge(delay=1, percentile=50, max_extra=0, min_samples=10)
+    hedged = hedge(lookup)
+    for _ in range(32):
+        await hedged(1)
+    assert hedge.stats.delay < 0.01
+
+
+@pytest.mark.asyncio
+async def test_hedge_percentile_primary_only():
+    lookup, _, cancelled = backend([1, 0])
+    hedge = Hedge(delay=0.01, percentile=50, max_extra=1, min_samples=1)
+    assert await hedge(lookup)(1) == Success(1)
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+    assert not hedge._latencies
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"percentile": 0}, {"percentile": 100}, {"max_extra": 2}]
+)
+def test_hedge_invalid(kwargs: dict[str, Any]):
+    with pytest.raises(ValueError):
+        Hedge(**kwargs)
@@ -3,3 +3,9 @@ import resultpipes
 
 def test_version():
     hasattr(resultpipes, "__version__")
+
+
+def test_all():
+    for name in resultpipes.__all__:
+        assert hasattr(resultpipes, name)
+    assert resultpipes.State is resultpipes.breaker.State
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+
+import pytest
+
+from resultpipes.bridge import LoopBridge
+from resultpipes.limit import *
+from resultpipes.pipe import APipeable, pipeable
+from resultpipes.result import Failure, Result, Success
+
+
+async def echo(x: int) -> Result[int, str]:
+    return Success(x)
+
+
+def saturated(result: Result[int, object]) -> bool:
+    return isinstance(result, Failure) and isinstance(result.value, Saturated)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_fail_fast(clock):
+    limiter = RateLimiter(rate=10, burst=2, clock=clock)
+    p = limiter(pipeable(echo), max_wait=0)
+    assert isinstance(p, APipeable)
+    assert [await p(1), await p(2)] == [Success(1), Success(2)]
+    assert saturated(await p(3))
+    clock.now = 0.1
+    assert await p(4) == Success(4)
+    assert saturated(await p(5))
+    assert limiter.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits():
+    limiter = RateLimiter(rate=100, burst=1)
+    limited = limiter(echo)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await asyncio.gather(*(limited(x) for x in range(5))) == [
+        Success(x) for x in range(5)
+    ]
+    assert loop.time() - start >= 0.035
+    assert saturated(await limiter(echo, max_wait=0.001)(1))
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_cancel_refunds(clock):
+    limiter = RateLimiter(rate=1, burst=1, clock=clock)
+    limited = limiter(echo)
+    await limited(1)
+    waiting = asyncio.ensure_future(limited(2))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.sleep(0)
+    clock.now = 1
+    assert await limiter(echo, max_wait=0)(3) == Success(3)
+
+
+@pytest.mark.asyncio
+async def test_bulkhead():
+    release = asyncio.Event()
+
+    async def slow(x: int) -> Result[int, str]:
+        await release.wait()
+        return Success(x)
+
+    bulk = Bulkhead(2)
+    waiting = bulk(slow)
+    tasks = [asyncio.ensure_future(waiting(x)) for x in range(3)]
+    await asyncio.sleep(0)
+    assert bulk.in_use == 2
+    assert saturated(await bulk(slow, max_wait=0)(9))
+    assert saturated(await bulk(slow, max_wait=0.01)(9))
+    release.set()
+    assert await asyncio.gather(*tasks) == [Success(x) for x in range(3)]
+    assert bulk.in_use == 0
+    assert bulk.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_fail_fast_with_capacity():
+    bulk = Bulkhead(2)
+    fail_fast = bulk(echo, max_wait=0)
+    assert [await fail_fast(x) for x in range(3)] == [Success(x) for x in range(3)]
+    assert await asyncio.gather(fail_fast(1), fail_fast(2)) == [Success(1), Success(2)]
+    assert bulk.rejected == 0
+
+
+def test_bulkhead_across_loops():
+    bulk = bulkhead("shared", 1)
+
+    async def contend() -> list[Result[int, object]]:
+        async def slow(x: int) -> Result[int, str]:
+            await asyncio.sleep(0.01)
+            return Success(x)
+
+        limited = bulk(slow)
+        return list(await asyncio.gather(limited(1), limited(2)))
+
+    for _ in range(2):
+        assert asyncio.run(contend()) == [Success(1), Success(2)]
+    assert bulk.in_use == 0
+
+    with LoopBridge() as bridge:
+        held = threading.Event()
+        release = threading.Event()
+
+        async def hold(x: int) -> Result[int, str]:
+            held.set()
+            await asyncio.to_thread(release.wait)
+            return Success(x)
+
+        future = bridge.submit(bulk(pipeable(hold)), 1)
+        held.wait()
+
+        async def wait_for_slot() -> Result[int, object]:
+            waiting = asyncio.ensure_future(bulk(echo)(2))
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+            assert saturated(await bulk(echo, max_wait=0.01)(3))
+            release.set()
+            return await waiting
+
+        assert asyncio.run(wait_for_slot()) == Success(2)
+        assert future.result() == Success(1)
+    assert bulk.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_cancel_waiting():
+    release = asyncio.Event()
+
+    async def slow(x: int) -> Result[int, str]:
+        await release.wait()
+        return Success(x)
+
+    bulk = Bulkhead(1)
+    holding = asyncio.ensure_future(bulk(slow)(1))
+    waiting = asyncio.ensure_future(bulk(slow)(2))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    release.set()
+    assert await holding == Success(1)
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert bulk.in_use == 0
+    assert await bulk(echo, max_wait=0)(3) == Success(3)
+
+
+def test_named_limits():
+    assert rate_limiter("api", 5, 10) is rate_limiter("api", 5, 10)
+    assert bulkhead("db", 4) is bulkhead("db", 4)
+    with pytest.raises(ValueError):
+        rate_limiter("api", 6, 10)
+    with pytest.raises(ValueError):
+        bulkhead("db", 5)
+    with pytest.raises(ValueError):
+        bulkhead("api", 5)
+
+
+@pytest.mark.parametrize(
+    "make",
+    [
+        lambda: RateLimiter(0),
+        lambda: RateLimiter(1, burst=0),
+        lambda: Bulkhead(0),
+    ],
+)
+def test_limits_invalid(make):
+    with pytest.raises(ValueError):
+        make()
@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from resultpipes.metrics import *
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+from resultpipes.trace import Outcome, Span, metering, tracing
+
+
+@pipeable
+def parse(x: str) -> Result[int, ValueError]:
+    try:
+        return Success(int(x))
+    except ValueError as exc:
+        return Failure(exc)
+
+
+@pipeable
+async def afetch(x: int) -> Result[str, str]:
+    return Success(str(x + 1))
+
+
+@pipeable
+def invert(x: int) -> Result[float, str]:
+    return Success(1 / x)
+
+
+def span(name, duration, outcome=Outcome.SUCCESS, error=None):
+    return Span(name, 1, None, 0.0, duration, outcome, error)
+
+
+def traced(metrics: Metrics) -> Any:
+    return tracing(metrics)
+
+
+def metered(metrics: Metrics) -> Any:
+    return metering(metrics.record)
+
+
+@pytest.mark.parametrize("hook", [traced, metered])
+def test_metrics_counts(hook):
+    pipe = parse | invert
+    metrics = Metrics()
+    with hook(metrics):
+        for x in ["1", "2", "x", "y"]:
+            pipe(x)
+        with pytest.raises(ZeroDivisionError):
+            pipe("0")
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {"parse", "invert", "parse | invert"}
+    parsed = snapshot["parse"]
+    assert (parsed.calls, parsed.successes) == (5, 3)
+    assert parsed.failures == {"ValueError": 2}
+    assert parsed.errors == {}
+    inverted = snapshot["invert"]
+    assert (inverted.calls, inverted.successes) == (3, 2)
+    assert inverted.errors == {"ZeroDivisionError": 1}
+    assert snapshot["parse | invert"].calls == 5
+
+
+@pytest.mark.asyncio
+async def test_metrics_metering_async():
+    pipe = parse | afetch | parse.offload()
+    metrics = Metrics()
+    with metering(metrics.record):
+        assert await pipe("1") == Success(2)
+        assert isinstance(await pipe("x"), Failure)
+    snapshot = metrics.snapshot()
+    assert snapshot["parse"].calls == 3
+    assert snapshot["parse"].failures == {"ValueError": 1}
+    assert snapshot["afetch"].calls == 1
+    assert snapshot["parse | afetch | parse"].calls == 2
+
+
+def test_metrics_record_histogram():
+    metrics = Metrics(buckets=[0.1, 1])
+    for seconds in [0.05, 0.5, 2]:
+        metrics.record("f", seconds, Success(1))
+    metrics.record("f", 0.05, RuntimeError())
+    f = metrics.snapshot()["f"]
+    assert f.counts == (2, 1, 1)
+    assert (f.calls, f.successes, f.errors) == (4, 3, {"RuntimeError": 1})
+
+
+def test_metrics_histogram():
+    metrics = Metrics(buckets=[0.1, 1])
+    for duration in [0.05, 0.1, 0.5, 2, 3]:
+        metrics(span("f", duration))
+    f = metrics.snapshot()["f"]
+    assert f.buckets == (0.1, 1.0)
+    assert f.counts == (2, 1, 2)
+    assert f.total_seconds == pytest.approx(5.65)
+
+
+def test_metrics_threads():
+    metrics = Metrics()
+
+    def work(_):
+        for _ in range(1000):
+            metrics(span("f", 0.001))
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(work, range(8)))
+    assert metrics.snapshot()["f"].calls == 8000
+
+
+def test_metrics_buckets_invalid():
+    with pytest.raises(ValueError):
+        Metrics(buckets=[1, 0.5])
+
+
+def test_render_prometheus():
+    metrics = Metrics(buckets=[0.1, 1])
+    metrics(span("f", 0.05))
+    metrics(span("f", 0.5, Outcome.FAILURE, "KeyError"))
+    metrics(span('say "hi"', 2, Outcome.ERROR, "ValueError"))
+    assert metrics.render("app").splitlines() == [
+        "# HELP app_stage_calls_total Stage calls.",
+        "# TYPE app_stage_calls_total counter",
+        'app_stage_calls_total{stage="f"} 2',
+        'app_stage_calls_total{stage="say \\"hi\\""} 1',
+        "# HELP app_stage_outcomes_total Stage calls by outcome and error type.",
+        "# TYPE app_stage_outcomes_total counter",
+        'app_stage_outcomes_total{stage="f",outcome="success",error=""} 1',
+        'app_stage_outcomes_total{stage="f",outcome="failure",error="KeyError"} 1',
+        'app_stage_outcomes_total{stage="say \\"hi\\"",outcome="error",error="ValueError"} 1',
+        "# HELP app_stage_duration_seconds Stage call durations.",
+        "# TYPE app_stage_duration_seconds histogram",
+        'app_stage_duration_seconds_bucket{stage="f",le="0.1"} 1',
+        'app_stage_duration_seconds_bucket{stage="f",le="1.0"} 2',
+        'app_stage_duration_seconds_bucket{stage="f",le="+Inf"} 2',
+        'app_stage_duration_seconds_sum{stage="f"} 0.55',
+        'app_stage_duration_seconds_count{stage="f"} 2',
+        'app_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 0',
+        'app_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 0',
+        'app_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1',
+        'app_stage_duration_seconds_sum{stage="say \\"hi\\""} 2.0',
+        'app_stage_duration_seconds_count{stage="say \\"hi\\""} 1',
+    ]
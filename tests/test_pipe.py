@@ -1,8 +1,15 @@
+import asyncio
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from functools import partial
-from typing import Any
+from typing import Any, cast
 
 import pytest
 
+from resultpipes.catch import catch
 from resultpipes.pipe import *
 
 
@@ -242,3 +249,301 @@ async def test_failure_async():
         return x
 
     assert await f("test") == Failure("test")
+
+
+def test_pipe_long_chain():
+    p = g
+    for _ in range(5000):
+        p = p | g
+    assert p(1) == Success(1)
+    assert len(p._stages) == 5001
+
+
+@pytest.mark.parametrize(
+    "p, expected",
+    [
+        (cast(Any, (f | g) & h) ^ id0, 4),
+        (f | (g | g), 3),
+        (f & (cast(Any, h) & h), 3),
+        (f ^ (id0 | g), 3),
+        (f | (g & h), 2),
+        (f & (h | g), 2),
+    ],
+)
+def test_pipe_flattened(p: Pipeable[Any, Any, Any], expected: int):
+    assert len(p._stages) == expected
+
+
+@pytest.mark.parametrize("x", ["1", "x"])
+def test_pipe_nested_semantics(x: str):
+    calls: list[str] = []
+
+    @pipeable
+    def a(y: int) -> Result[int, Error]:
+        calls.append("a")
+        return Failure(Error())
+
+    @pipeable
+    def b(error: Error) -> Result[int, Error]:
+        calls.append("b")
+        return Success(0)
+
+    result = (f | (a & b))(x)
+    if x == "1":
+        assert result == Success(0)
+        assert calls == ["a", "b"]
+    else:
+        assert isinstance(result, Failure)
+        assert calls == []
+
+
+def test_pipeable_func():
+    def k(x: int) -> Result[int, Error]:
+        return Success(x)
+
+    assert Pipeable(k).func is k
+    p = g | g
+    assert p.func is p
+
+
+@pytest.mark.parametrize(
+    "p, expected",
+    [
+        (g1 | g | g | g, [True, False]),
+        (f | g | g1 | g & h, [False, True, False]),
+        (g1 | g | g1 | g, [True, False, True, False]),
+        (f | g1, [False, True]),
+    ],
+)
+def test_apipeable_plan(p: APipeable[Any, Any, Any], expected: list[bool]):
+    assert [stage.is_async for stage in p._plan] == expected
+
+
+@pytest.mark.parametrize("x", ["1", "x"])
+@pytest.mark.asyncio
+async def test_apipeable_mixed_semantics(x: str):
+    def outcome(result: Result[Any, Any]) -> tuple[type, Any]:
+        return type(result), type(result.value)
+
+    sync = cast(Any, (f | g | g) & h | g) ^ id0
+    mixed = cast(Any, (f1 | g | g) & h | g1) ^ id0
+    assert outcome(await mixed(x)) == outcome(sync(x))
+    assert outcome(await (f1 | (g1 & h))(x)) == outcome((f | (g & h))(x))
+
+
+@pytest.mark.asyncio
+async def test_apipeable_no_dispatch_on_call(monkeypatch: pytest.MonkeyPatch):
+    p = cast(Any, f1 & h) & h1 | g
+    await p("x")
+
+    def fail(obj: Any) -> bool:
+        assert False
+
+    monkeypatch.setattr("resultpipes.pipe.is_async_callable", fail)
+    match await p("x"):
+        case Failure(error):
+            assert isinstance(error, Error1)
+        case _:
+            assert False
+
+
+def test_stage_route():
+    assert [stage.route for stage in ((f | g) & h ^ id0)._stages] == [
+        Route.RESULT,
+        Route.SUCCESS,
+        Route.FAILURE,
+        Route.RESULT,
+    ]
+
+
+@pipeable
+@success
+def inc(x: int) -> int:
+    return x + 1
+
+
+@pipeable
+@success
+async def ainc(x: int) -> int:
+    return x + 1
+
+
+@pipeable
+@failure
+def wrap_error(x: int) -> Error:
+    return Error()
+
+
+def test_explain():
+    p = (f & h | inc) | (g1 & h)
+    assert p.explain().splitlines() == [
+        "^ f (sync)",
+        "& h (sync)",
+        "| inc (sync, always Success)",
+        "| pipeline (async)",
+        "    ^ g1 (async)",
+        "    & h (sync)",
+    ]
+    assert (g | Pipeable(g.func).offload()).explain().splitlines() == [
+        "^ g (sync)",
+        "| g (thread)",
+    ]
+
+
+@pytest.mark.parametrize(
+    "p, expected",
+    [
+        (((cast(Any, inc) & h) & h) | g, "inc | g"),
+        (((cast(Any, g) & inc) & h) | g, "g & inc | g"),
+        ((cast(Any, g | wrap_error) | g) & h, "g | wrap_error & h"),
+        (((g | inc) ^ id0) & h, "g | inc ^ id0 & h"),
+        ((g | inc) & h, "g | inc & h"),
+        (cast(Any, inc | inc) & h, "inc | inc"),
+        (g | (cast(Any, inc) & h), "g | inc"),
+    ],
+)
+def test_optimize_prune(p: Pipeable[Any, Any, Any], expected: str):
+    optimized = p.optimize()
+    assert optimized._name == expected
+    assert type(optimized(1)) is type(p(1))
+    assert type(optimized(1).value) is type(p(1).value)
+
+
+def test_optimize_merge():
+    p = ((f | inc | inc | wrap_error) & h) | inc | inc
+    optimized = p.optimize()
+    assert optimized.explain().splitlines() == [
+        "^ f (sync)",
+        "| inc | inc | wrap_error (sync, always Failure)",
+        "& h (sync)",
+        "| inc | inc (sync, always Success)",
+    ]
+    assert len(optimized._stages) == 4
+    assert isinstance(optimized("1").value, Error1)
+    assert isinstance(optimized("x").value, Error1)
+    assert (inc | inc | inc).optimize()(1) == Success(4)
+    assert len((inc | inc | inc).optimize()._stages) == 1
+    assert isinstance(pickle.loads(pickle.dumps(optimized))("1").value, Error1)
+
+
+@pipeable
+@failure
+def mark(e: str) -> str:
+    return f"mark({e})"
+
+
+@pipeable
+def positive(x: int) -> Result[int, str]:
+    return Success(x) if x >= 0 else Failure("e")
+
+
+def test_optimize_merge_routes():
+    # mark after | runs only on successes, and must not swallow the & handler of the failures of positive.
+    p = cast(Any, positive | mark) & mark
+    optimized = p.optimize()
+    assert [optimized(x) for x in (-1, 1)] == [p(x) for x in (-1, 1)]
+    assert optimized(-1) == Failure("mark(e)")
+
+
+def test_optimize_twice():
+    for p in [inc | (cast(Any, inc | inc) & h), inc | (inc | inc).optimize()]:
+        once = p.optimize()
+        twice = once.optimize()
+        assert twice.explain() == once.explain()
+        assert twice(1) == once(1) == p(1) == Success(4)
+    assert (inc | (inc | inc).optimize()).optimize().explain() == (
+        "^ inc | inc | inc (sync, always Success)"
+    )
+
+
+@pipeable
+@catch(lambda exc: "caught")
+@success
+def risky(x: int) -> int:
+    return 1 // x
+
+
+@pipeable
+def fallback(e: str) -> Result[str, str]:
+    return Success("fallback")
+
+
+def test_optimize_wrapped_success():
+    # catch copies the attributes of the function it wraps, but can fail all the same.
+    p = risky & fallback
+    assert p.explain().splitlines() == ["^ risky (sync)", "& fallback (sync)"]
+    assert p.optimize()(0) == p(0) == Success("fallback")
+    assert p.optimize()(1) == Success(1)
+    q = g | risky
+    assert q.optimize()(0) == q(0) == Failure("caught")
+    assert len((inc | risky).optimize()._stages) == 2
+
+
+@pytest.mark.asyncio
+async def test_optimize_async():
+    p = f | (ainc & h) | inc | inc | (g & h)
+    optimized = p.optimize()
+    assert isinstance(optimized, APipeable)
+    assert optimized.explain().splitlines() == [
+        "^ f (sync)",
+        "| ainc (async, always Success)",
+        "| inc | inc (sync, always Success)",
+        "| pipeline (sync)",
+        "    ^ g (sync)",
+        "    & h (sync)",
+    ]
+    assert await optimized("1") == Success(4)
+    assert isinstance(await optimized("x"), Failure)
+
+
+@pytest.mark.asyncio
+async def test_offload():
+    def blocking(x: int) -> Result[int, Error]:
+        time.sleep(0.05)
+        return Success(threading.get_ident())
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    p = pipeable(blocking, offload="thread") | g1
+    assert isinstance(p, APipeable)
+    ticker = asyncio.ensure_future(tick())
+    result = await p(1)
+    ticker.cancel()
+    assert result != Success(threading.get_ident())
+    assert ticks > 2
+
+    @pipeable(offload="thread", executor=ThreadPoolExecutor(1))
+    @catch(lambda exc: Error1())
+    def raises(x: int) -> Result[int, Error]:
+        raise ValueError()
+
+    match await raises(1):
+        case Failure(error):
+            assert isinstance(error, Error1)
+        case _:
+            assert False
+
+
+@pytest.mark.asyncio
+async def test_offload_context():
+    var: ContextVar[int] = ContextVar("var", default=0)
+
+    @pipeable
+    def read(x: int) -> Result[int, Error]:
+        return Success(var.get())
+
+    var.set(3)
+    assert await read.offload()(1) == Success(3)
+
+
+def test_offload_invalid():
+    with pytest.raises(ValueError):
+        pipeable(f1.func, offload="thread")
+    with pytest.raises(ValueError):
+        pipeable(f.func, offload="process")  # type: ignore
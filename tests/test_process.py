@@ -0,0 +1,84 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from resultpipes.pipe import APipeable, Pipeable, pipeable, success
+from resultpipes.process import *
+from resultpipes.result import Failure, Result, Success
+
+
+@pipeable
+def parse(x: str) -> Result[int, str]:
+    try:
+        return Success(int(x))
+    except ValueError:
+        return Failure(x)
+
+
+@pipeable
+@success
+def double(x: int) -> int:
+    return 2 * x
+
+
+@pipeable
+def recover(error: str) -> Result[int, str]:
+    return Success(len(error))
+
+
+@pipeable
+async def aparse(x: str) -> Result[int, str]:
+    return parse(x)
+
+
+pipe = (parse | double) & recover
+
+
+def expected(inputs: list[str]) -> list[Result[int, str]]:
+    return [pipe(x) for x in inputs]
+
+
+@pytest.mark.parametrize("result", [Success(1), Failure("x"), Success(Failure(1))])
+def test_pickle_result(result: Result[int, str]):
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert type(pickle.loads(pickle.dumps(result))) is type(result)
+
+
+def test_pickle_pipeable():
+    p = pickle.loads(pickle.dumps(pipe | (double & recover)))
+    assert isinstance(p, Pipeable)
+    assert [p(x) for x in ["1", "ab"]] == [Success(4), Success(4)]
+
+
+@pytest.mark.asyncio
+async def test_pickle_apipeable():
+    p = pickle.loads(pickle.dumps(aparse | double))
+    assert isinstance(p, APipeable)
+    assert await p("2") == Success(4)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_process_map(ordered: bool):
+    inputs = [str(x) if x % 3 else "x" * x for x in range(100)]
+    with ProcessPoolExecutor(2) as executor:
+        results = list(
+            process_map(pipe, inputs, chunksize=7, ordered=ordered, executor=executor)
+        )
+    if ordered:
+        assert results == expected(inputs)
+    else:
+        assert sorted(results, key=lambda r: r.value) == sorted(
+            expected(inputs), key=lambda r: r.value
+        )
+
+
+def test_process_map_own_pool():
+    inputs = ["1", "2", "z"]
+    assert list(process_map(pipe, inputs, chunksize=2, window=1)) == expected(inputs)
+
+
+@pytest.mark.parametrize("chunksize, window", [(0, 1), (1, 0)])
+def test_process_map_invalid(chunksize: int, window: int):
+    with pytest.raises(ValueError):
+        process_map(pipe, [], chunksize, window=window)
@@ -0,0 +1,240 @@
+import asyncio
+from itertools import count
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+from resultpipes.stream import *
+
+
+@pipeable
+async def half(x: int) -> Result[int, int]:
+    await asyncio.sleep(0.001 * (x % 3))
+    return Success(x // 2) if x % 2 == 0 else Failure(x)
+
+
+@pipeable
+def shalf(x: int) -> Result[int, int]:
+    return Success(x // 2) if x % 2 == 0 else Failure(x)
+
+
+def expected(n: int) -> list[Result[int, int]]:
+    return [Success(x // 2) if x % 2 == 0 else Failure(x) for x in range(n)]
+
+
+def outcome(result: Result[int, int]) -> tuple[str, int]:
+    return type(result).__name__, result.value
+
+
+async def agen(n: int) -> AsyncIterator[int]:
+    for x in range(n):
+        yield x
+
+
+@pytest.mark.asyncio
+async def test_amap_ordered():
+    assert [r async for r in half.amap(range(20), concurrency=4)] == expected(20)
+
+
+@pytest.mark.asyncio
+async def test_amap_unordered():
+    results = [r async for r in half.amap(agen(20), concurrency=4, ordered=False)]
+    assert sorted(results, key=outcome) == sorted(expected(20), key=outcome)
+
+
+@pytest.mark.asyncio
+async def test_amap_sync_pipeable():
+    assert [r async for r in shalf.amap(agen(10), concurrency=3)] == expected(10)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.asyncio
+async def test_amap_concurrency(ordered: bool):
+    running = 0
+    most = 0
+
+    async def f(x: int) -> Result[int, int]:
+        nonlocal running, most
+        running += 1
+        most = max(most, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return Success(x)
+
+    assert len([r async for r in amap(f, range(50), 5, ordered)]) == 50
+    assert most == 5
+
+
+@pytest.mark.asyncio
+async def test_amap_lazy_and_cancels():
+    pulled = 0
+    cancelled = 0
+
+    def naturals() -> Iterator[int]:
+        nonlocal pulled
+        while True:
+            pulled += 1
+            yield pulled
+
+    async def f(x: int) -> Result[int, int]:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(0 if x == 1 else 1)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return Success(x)
+
+    results = amap(f, naturals(), concurrency=3)
+    assert await anext(results) == Success(1)
+    await results.aclose()
+    await asyncio.sleep(0)
+    assert pulled == 3
+    assert cancelled == 2
+
+
+def test_amap_concurrency_invalid():
+    with pytest.raises(ValueError):
+        amap(half, [], concurrency=0)
+
+
+def sleeper(seconds: float):
+    @pipeable
+    async def stage(x: int) -> Result[int, int]:
+        await asyncio.sleep(seconds)
+        return Success(x)
+
+    return stage
+
+
+@pipeable
+def fail_odd(x: int) -> Result[int, int]:
+    return Success(x) if x % 2 == 0 else Failure(x)
+
+
+@pipeable
+def recover(x: int) -> Result[int, int]:
+    return Success(-x)
+
+
+@pytest.mark.asyncio
+async def test_stream_semantics():
+    p = (half | fail_odd | shalf) & recover | shalf
+    results = [r async for r in p.stream(range(30), concurrency=3, buffer=2)]
+    assert results == [await p(x) for x in range(30)]
+
+
+@pytest.mark.asyncio
+async def test_stream_overlaps_stages():
+    p = sleeper(0.02) | sleeper(0.02) | sleeper(0.02)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = [r async for r in p.stream(range(10))]
+    assert results == [Success(x) for x in range(10)]
+    assert loop.time() - start < 0.4
+
+
+@pytest.mark.asyncio
+async def test_stream_unordered_per_stage_concurrency():
+    p = half | sleeper(0.001)
+    results = [r async for r in p.stream(agen(20), concurrency=[2, 4], ordered=False)]
+    assert sorted(results, key=outcome) == sorted(expected(20), key=outcome)
+
+
+@pytest.mark.asyncio
+async def test_stream_bounded():
+    pulled = 0
+
+    def naturals() -> Iterator[int]:
+        nonlocal pulled
+        while True:
+            pulled += 1
+            yield pulled
+
+    results = (shalf | sleeper(0)).stream(naturals(), concurrency=2, buffer=3)
+    await anext(results)
+    await asyncio.sleep(0.01)
+    await results.aclose()
+    assert pulled <= 2 + 2 + 3 + 3 + 1
+
+
+@pytest.mark.asyncio
+async def test_stream_raises():
+    @pipeable
+    async def boom(x: int) -> Result[int, int]:
+        raise ValueError(x)
+
+    with pytest.raises(ValueError):
+        [r async for r in (half | boom).stream(range(10), concurrency=2)]
+
+
+@pytest.mark.parametrize("concurrency, buffer", [([1], 1), (0, 1), (1, 0)])
+def test_stream_invalid(concurrency: int | list[int], buffer: int):
+    with pytest.raises(ValueError):
+        (half | half).stream([], concurrency, buffer)
+
+
+def parse(x: str) -> Result[int, str]:
+    return Success(int(x)) if x.isdigit() else Failure(x)
+
+
+def counted(n: int, pulled: list[int]) -> Iterator[str]:
+    for i in count():
+        if i == n:
+            return
+        pulled.append(i)
+        yield "x" if i == 5 else str(i)
+
+
+def test_imap_lazy():
+    pulled: list[int] = []
+    results = imap(parse, counted(10**9, pulled))
+    assert next(results) == Success(0)
+    assert pulled == [0]
+    assert [next(results) for _ in range(5)][-1] == Failure("x")
+    assert pulled == list(range(6))
+
+
+def test_imap_stop_on_failure():
+    results = list(imap(parse, counted(10, []), stop_on_failure=True))
+    assert len(results) == 6
+    assert results[-1] == Failure("x")
+    assert len(list(imap(parse, counted(10, [])))) == 10
+
+
+@pytest.mark.parametrize("stop, expected", [(False, [4, 4, 2]), (True, [4, 2])])
+def test_imap_chunks(stop: bool, expected: list[int]):
+    chunks = list(imap_chunks(parse, counted(10, []), 4, stop))
+    assert [len(chunk) for chunk in chunks] == expected
+    flat = [result for chunk in chunks for result in chunk]
+    assert flat == list(imap(parse, counted(10, []), stop))
+
+
+def test_imap_chunks_invalid():
+    with pytest.raises(ValueError):
+        imap_chunks(parse, [], 0)
+
+
+def test_partition():
+    good: list[int] = []
+    bad: list[str] = []
+    assert partition(imap(parse, counted(10, [])), good.append, bad.append) == (9, 1)
+    assert good == [0, 1, 2, 3, 4, 6, 7, 8, 9]
+    assert bad == ["x"]
+    assert list(successes(imap(parse, ["1", "a", "2"]))) == [1, 2]
+    assert list(failures(imap(parse, ["1", "a", "2"]))) == ["a"]
+
+
+def test_pipeable_imap():
+    p = pipeable(parse) | pipeable(lambda x: Success(x * 2))
+    assert list(p.imap(["1", "a", "2"])) == [Success(2), Failure("a"), Success(4)]
+    assert list(p.imap(["1", "a", "2"], stop_on_failure=True)) == [
+        Success(2),
+        Failure("a"),
+    ]
+    assert list(p.imap_chunks(["1", "a", "2"], size=2)) == [
+        [Success(2), Failure("a")],
+        [Success(4)],
+    ]
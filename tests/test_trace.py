@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+import resultpipes.trace
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+from resultpipes.trace import *
+
+
+@pipeable
+def parse(x: str) -> Result[int, ValueError]:
+    try:
+        return Success(int(x))
+    except ValueError as exc:
+        return Failure(exc)
+
+
+@pipeable
+def default(error: ValueError) -> Result[int, str]:
+    return Success(0)
+
+
+@pipeable
+def double(x: int) -> Result[int, str]:
+    return Success(2 * x)
+
+
+@pipeable
+async def afetch(x: int) -> Result[int, str]:
+    await asyncio.sleep(0)
+    return Success(x + 1)
+
+
+@pipeable
+def show(x: int) -> Result[str, str]:
+    return Success(str(x))
+
+
+@pipeable
+def explode(x: int) -> Result[int, str]:
+    raise RuntimeError(x)
+
+
+def summary(spans):
+    return [(span.name, span.outcome, span.error) for span in spans]
+
+
+def test_trace_disabled():
+    recorder = SpanRecorder()
+    add_exporter(recorder)
+    remove_exporter(recorder)
+    assert (parse | double)("2") == Success(4)
+    assert recorder.spans == []
+    assert resultpipes.trace._hooks == []
+
+
+def test_trace_stages():
+    pipe = parse & default | double
+    with tracing(SpanRecorder()) as recorder:
+        assert pipe("x") == Success(0)
+    assert summary(recorder.spans) == [
+        ("parse", Outcome.FAILURE, "ValueError"),
+        ("default", Outcome.SUCCESS, None),
+        ("double", Outcome.SUCCESS, None),
+        ("parse & default | double", Outcome.SUCCESS, None),
+    ]
+    *stages, root = recorder.spans
+    assert root.parent_id is None
+    assert all(span.parent_id == root.span_id for span in stages)
+    assert all(span.duration >= 0 for span in recorder.spans)
+    assert pipe("x") == Success(0)
+    assert len(recorder.spans) == 4
+
+
+def test_trace_nested():
+    pipe = show | (parse & default | double)
+    with tracing(SpanRecorder()) as recorder:
+        assert pipe(5) == Success(10)
+    *stages, nested, root = recorder.spans
+    assert root.name == "show | (parse & default | double)"
+    assert nested.name == "parse & default | double"
+    assert nested.parent_id == root.span_id
+    assert [span.name for span in stages] == ["show", "parse", "double"]
+    assert stages[0].parent_id == root.span_id
+    assert {span.parent_id for span in stages[1:]} == {nested.span_id}
+
+
+def test_trace_error():
+    with tracing(SpanRecorder()) as recorder:
+        with pytest.raises(RuntimeError):
+            (double | explode)(1)
+    assert summary(recorder.spans) == [
+        ("double", Outcome.SUCCESS, None),
+        ("explode", Outcome.ERROR, "RuntimeError"),
+        ("double | explode", Outcome.ERROR, "RuntimeError"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trace_async():
+    pipe = parse | double | afetch | double
+    with tracing(SpanRecorder()) as recorder:
+        assert await pipe("1") == Success(6)
+    assert [span.name for span in recorder.spans] == [
+        "parse",
+        "double",
+        "afetch",
+        "double",
+        "parse | double | afetch | double",
+    ]
+    root = recorder.spans[-1]
+    assert {span.parent_id for span in recorder.spans[:-1]} == {root.span_id}
+
+
+@pytest.mark.asyncio
+async def test_trace_offload():
+    pipe = double | pipeable(show.func, offload="thread")
+    with tracing(SpanRecorder()) as recorder:
+        assert await pipe(1) == Success("2")
+    assert [span.name for span in recorder.spans] == [
+        "double",
+        "show",
+        "double | show",
+    ]
+    assert recorder.spans[1].parent_id == recorder.spans[2].span_id
+
+
+def test_exporter_errors_logged(caplog):
+    def broken(span):
+        raise ValueError()
+
+    with tracing(broken), tracing(SpanRecorder()) as recorder:
+        assert double(1) == Success(2)
+    assert len(recorder.spans) == 1
+    assert "span exporter" in caplog.text
+
+
+def test_remove_exporter():
+    recorder = SpanRecorder()
+    add_exporter(recorder)
+    double(1)
+    remove_exporter(recorder)
+    double(1)
+    assert len(recorder.spans) == 1
+
+
+def test_metering():
+    measured = []
+
+    def meter(name, seconds, result):
+        measured.append((name, result))
+
+    with metering(meter):
+        assert (parse | double)("2") == Success(4)
+        with pytest.raises(RuntimeError):
+            explode(1)
+    double(1)
+    assert [name for name, _ in measured] == [
+        "parse",
+        "double",
+        "parse | double",
+        "explode",
+    ]
+    assert measured[1][1] == Success(4)
+    assert isinstance(measured[3][1], RuntimeError)
+
+
+def test_metering_while_tracing(caplog):
+    measured = []
+
+    def broken(name, seconds, result):
+        raise ValueError()
+
+    with metering(broken), metering(lambda *args: measured.append(args[0])):
+        with tracing(SpanRecorder()) as recorder:
+            assert (parse | double)("2") == Success(4)
+    assert measured == ["parse", "double", "parse | double"]
+    assert len(recorder.spans) == 3
+    assert "meter" in caplog.text
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from resultpipes.pipe import pipeable
+from resultpipes.result import Failure, Result, Success
+from resultpipes.traverse import *
+
+
+@pipeable
+def shalf(x: int) -> Result[int, int]:
+    return Success(x // 2) if x % 2 == 0 else Failure(x)
+
+
+@pipeable
+async def half(x: int) -> Result[int, int]:
+    await asyncio.sleep(0.001 * (x % 3))
+    return Success(x // 2) if x % 2 == 0 else Failure(x)
+
+
+def test_sequence():
+    assert sequence([Success(1), Success(2)]) == Success([1, 2])
+    assert sequence([]) == Success([])
+    assert sequence([Success(1), Failure("a"), Failure("b")]) == Failure("a")
+
+
+def test_sequence_stops_at_failure():
+    consumed = []
+
+    def results():
+        for x in range(10):
+            consumed.append(x)
+            yield shalf(x)
+
+    assert sequence(results()) == Failure(1)
+    assert consumed == [0, 1]
+
+
+def test_sequence_all():
+    assert sequence_all([Success(1), Success(2)]) == Success([1, 2])
+    assert sequence_all([Success(1), Failure("a"), Failure("b")]) == Failure(["a", "b"])
+
+
+def test_traverse_sync():
+    calls = []
+
+    @pipeable
+    def counted(x: int) -> Result[int, int]:
+        calls.append(x)
+        return shalf(x)
+
+    assert traverse(shalf)([0, 2, 4]) == Success([0, 1, 2])
+    assert traverse(counted)([0, 2, 3, 4, 5]) == Failure(3)
+    assert calls == [0, 2, 3]
+    assert traverse_all(shalf)([0, 1, 2, 3]) == Failure([1, 3])
+    assert traverse_all(shalf)(iter([0, 2])) == Success([0, 1])
+
+
+@pytest.mark.asyncio
+async def test_traverse_async_ordered():
+    assert await traverse(half, concurrency=4)(range(0, 40, 2)) == Success(
+        list(range(20))
+    )
+    assert await traverse(half)([]) == Success([])
+
+
+@pytest.mark.asyncio
+async def test_traverse_async_input():
+    async def inputs():
+        for x in (4, 2, 0):
+            yield x
+
+    assert await traverse(half)(inputs()) == Success([2, 1, 0])
+    assert await traverse_all(half)(inputs()) == Success([2, 1, 0])
+
+
+@pytest.mark.asyncio
+async def test_traverse_async_cancels():
+    started = []
+    cancelled = []
+
+    @pipeable
+    async def slow(x: int) -> Result[int, int]:
+        started.append(x)
+        if x == 1:
+            return Failure(x)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(x)
+            raise
+        return Success(x)
+
+    result = await asyncio.wait_for(traverse(slow, concurrency=3)(range(100)), 1)
+    assert result == Failure(1)
+    assert sorted(started) == [0, 1, 2]
+    assert sorted(cancelled) == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_traverse_async_concurrency():
+    running = 0
+    peak = 0
+
+    @pipeable
+    async def tracked(x: int) -> Result[int, int]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return Success(x)
+
+    assert await traverse(tracked, concurrency=3)(range(20)) == Success(list(range(20)))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_traverse_all_async():
+    assert await traverse_all(half, concurrency=2)(range(6)) == Failure([1, 3, 5])
+    assert await traverse_all(half)(range(0, 6, 2)) == Success([0, 1, 2])
+
+
+def test_traverse_concurrency_invalid():
+    with pytest.raises(ValueError):
+        traverse(half, concurrency=0)
+    with pytest.raises(ValueError):
+        traverse_all(shalf, concurrency=0)